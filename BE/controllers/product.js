@@ -318,4 +318,73 @@ export const deleteProduct = async (req, res) => {
       error: error.message 
     });
   }
-};
\ No newline at end of file
+};
+
+// Search listed products by name, description or tags (used by the scraping service)
+export const searchProducts = async (req, res) => {
+  try {
+    const query = (req.query.q || '').trim();
+    const limit = Math.min(parseInt(req.query.limit) || 20, 100);
+
+    if (!query) {
+      return res.status(400).json({ 
+        success: false,
+        message: "Query parameter 'q' is required." 
+      });
+    }
+
+    const escaped = query.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    const pattern = new RegExp(escaped.split(/\s+/).join('|'), 'i');
+
+    const products = await Product.find({
+      $or: [{ name: pattern }, { description: pattern }, { tags: pattern }],
+    })
+      .limit(limit)
+      .populate('shopId', 'name address')
+      .lean();
+
+    res.status(200).json({ 
+      success: true,
+      products,
+      count: products.length
+    });
+
+  } catch (error) {
+    console.error('❌ Error searching products:', error);
+    res.status(500).json({ 
+      success: false,
+      message: "An error occurred while searching products.", 
+      error: error.message 
+    });
+  }
+};
+
+// Page through every product (used by the scraping service's spec index)
+export const listCatalog = async (req, res) => {
+  try {
+    const skip = Math.max(parseInt(req.query.skip) || 0, 0);
+    const limit = Math.min(parseInt(req.query.limit) || 200, 1000);
+
+    const products = await Product.find({})
+      .sort({ _id: 1 })
+      .skip(skip)
+      .limit(limit)
+      .select('name description tags category discountPrice shopId createdAt')
+      .populate('shopId', 'name')
+      .lean();
+
+    res.status(200).json({ 
+      success: true,
+      products,
+      count: products.length
+    });
+
+  } catch (error) {
+    console.error('❌ Error listing product catalog:', error);
+    res.status(500).json({ 
+      success: false,
+      message: "An error occurred while listing the product catalog.", 
+      error: error.message 
+    });
+  }
+};
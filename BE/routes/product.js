@@ -4,7 +4,9 @@ import {
   updatedProduct, 
   getProduct, 
   getShopProducts, 
-  deleteProduct 
+  deleteProduct,
+  searchProducts,
+  listCatalog
 } from '../controllers/product.js';
 
 const router = express.Router();
@@ -18,6 +20,12 @@ router.put('/update-product/:id', updatedProduct);
 // Get single product (GET)
 router.get('/get-product/:productId', getProduct);
 
+// Search products across all shops (GET)
+router.get('/search', searchProducts);
+
+// Page through the whole catalog (GET)
+router.get('/catalog', listCatalog);
+
 // Get all products for a shop (GET)
 router.get('/shop-products/:shopId', getShopProducts);
 
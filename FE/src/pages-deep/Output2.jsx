@@ -151,24 +151,28 @@ const Output2 = () => {
 
       setData(productsArray);
 
-      // Calculate the average price
-      const prices = productsArray
-        .map(item => {
-          const priceStr = item.Price || item.price || '0';
-          const numericPrice = parseFloat(priceStr.replace(/[^0-9.-]+/g, ""));
-          return isNaN(numericPrice) ? 0 : numericPrice;
-        })
-        .filter(price => price > 0);
-
-      if (prices.length > 0) {
-        const avgPrice = prices.reduce((acc, price) => acc + price, 0) / prices.length;
-        setAveragePrice(avgPrice.toFixed(2));
+      // Use the server-side average price; fall back to parsing prices locally
+      if (result.statistics && result.statistics.mean_price != null) {
+        setAveragePrice(result.statistics.mean_price.toFixed(2));
+      } else {
+        const prices = productsArray
+          .map(item => {
+            const priceStr = item.Price || item.price || '0';
+            const numericPrice = parseFloat(priceStr.replace(/[^0-9.-]+/g, ""));
+            return isNaN(numericPrice) ? 0 : numericPrice;
+          })
+          .filter(price => price > 0);
+
+        if (prices.length > 0) {
+          const avgPrice = prices.reduce((acc, price) => acc + price, 0) / prices.length;
+          setAveragePrice(avgPrice.toFixed(2));
+        }
       }
 
       // Identify top three suggestions
       const scores = productsArray.map((item, index) => ({
         ...item,
-        reasonabilityScore: calculateReasonabilityScore(item.Rating, item.Reviews),
+        reasonabilityScore: item.reasonability_score ?? calculateReasonabilityScore(item.Rating, item.Reviews),
       }));
       
       const topThree = scores
@@ -410,7 +414,7 @@ const Output2 = () => {
                       <td className="py-2 px-4 border-b">{item.Reviews}</td>
                       <td className="py-2 px-4 border-b">
                         <span className="bg-gray-200 px-2 py-1 rounded text-sm">
-                          {calculateReasonabilityScore(item.Rating, item.Reviews).toFixed(1)}
+                          {(item.reasonability_score ?? calculateReasonabilityScore(item.Rating, item.Reviews)).toFixed(1)}
                         </span>
                       </td>
                       <td className="py-2 px-4 border-b text-sm text-gray-600">
@@ -177,7 +177,7 @@ const Output3 = () => {
       // Calculate top suggestions
       const scores = providersArray.map((provider) => ({
         ...provider,
-        reasonabilityScore: calculateReasonabilityScore(
+        reasonabilityScore: provider.reasonability_score ?? calculateReasonabilityScore(
           provider.rating || provider.Rating,
           provider.reviews || provider.Reviews
         ),
@@ -413,10 +413,10 @@ const Output3 = () => {
                       <td className="py-2 px-4 border-b">{item.location || item.Location}</td>
                       <td className="py-2 px-4 border-b">
                         <span className="bg-gray-200 px-2 py-1 rounded text-sm">
-                          {calculateReasonabilityScore(
+                          {(item.reasonability_score ?? calculateReasonabilityScore(
                             item.rating || item.Rating, 
                             item.reviews || item.Reviews
-                          ).toFixed(1)}
+                          )).toFixed(1)}
                         </span>
                       </td>
                     </tr>
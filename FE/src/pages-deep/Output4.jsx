@@ -63,14 +63,13 @@ const Output3 = () => {
     setError(null);
   
     try {
-      // Join service descriptions into a single string, separated by commas
+      // Non-empty service descriptions, searched separately by the API
       const descriptions = formData.services
         .map((service) => service.service_description)
-        .filter(description => description.trim() !== "") // Filter out any empty descriptions
-        .join(", ");
+        .filter(description => description.trim() !== "");
   
       const response = await fetch(
-        `http://localhost:3000/api/scrapedata/scrape/`,
+        `http://127.0.0.1:8000/scrape-service-providers/${formData.serviceType}`,
         {
           method: "POST",
           headers: {
@@ -78,7 +77,7 @@ const Output3 = () => {
           },
           body: JSON.stringify({
             location: formData.location,
-            description: descriptions, // Use a single string for description
+            services: descriptions,
           }),
         }
       );
@@ -93,26 +92,33 @@ const Output3 = () => {
       console.log("API Response:", result);
   
       // Check if the response contains the expected data
-      if (!Array.isArray(result)) {
+      if (!Array.isArray(result.results)) {
         throw new Error("Unexpected API response format");
       }
   
-      setData(result);
+      const providers = result.results;
+      setData(providers);
   
-      // Calculate the average price
-      const prices = result.map((service) =>
-        parseFloat(service.Price.replace(/[^0-9.-]+/g, ""))
-      );
-      const avgPrice =
-        prices.reduce((acc, price) => acc + price, 0) / prices.length;
-      setAveragePrice(avgPrice.toFixed(2));
+      // Use the server-side average price; fall back to parsing prices locally
+      if (result.statistics && result.statistics.mean_price != null) {
+        setAveragePrice(result.statistics.mean_price.toFixed(2));
+      } else {
+        const prices = providers
+          .map((service) => parseFloat(String(service.Price || "").replace(/[^0-9.-]+/g, "")))
+          .filter((price) => price > 0);
+        setAveragePrice(
+          prices.length > 0
+            ? (prices.reduce((acc, price) => acc + price, 0) / prices.length).toFixed(2)
+            : null
+        );
+      }
   
       // Identify top three suggestions
-      const scores = result.map((service) => ({
+      const scores = providers.map((service) => ({
         ...service,
-        reasonabilityScore: calculateReasonabilityScore(
-          service.Rating,
-          service.Reviews
+        reasonabilityScore: service.reasonability_score ?? calculateReasonabilityScore(
+          parseFloat(service.rating) || 0,
+          parseFloat(service.reviews) || 0
         ),
       }));
       const topThree = scores
@@ -162,8 +168,8 @@ const Output3 = () => {
                 className="mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500"
               >
                 <option value="medical">Medical</option>
-                <option value="consulting">Consulting</option>
-                <option value="legal">Legal</option>
+                <option value="electrical">Electrical</option>
+                <option value="civil">Civil</option>
               </select>
             </div>
 
@@ -255,13 +261,13 @@ const Output3 = () => {
                   {topSuggestions.map((service, index) => (
                     <li key={index} className="flex justify-between">
                       <a
-                        href={service.Website}
+                        href={service.website}
                         target="_blank"
                         rel="noopener noreferrer"
                       >
-                        <span>{service["Service Description"]}</span>
+                        <span>{service.service_provider}</span>
                       </a>
-                      <span>Score: {service.reasonabilityScore}</span>
+                      <span>Score: {service.reasonabilityScore.toFixed(1)}</span>
                     </li>
                   ))}
                 </ul>
@@ -272,8 +278,8 @@ const Output3 = () => {
               <table className="min-w-full divide-y divide-gray-300 bg-white">
                 <thead>
                   <tr>
-                    <th className="px-4 py-2">Service Description</th>
-                    <th className="px-4 py-2">Price</th>
+                    <th className="px-4 py-2">Service Provider</th>
+                    <th className="px-4 py-2">Specialization</th>
                     <th className="px-4 py-2">Rating</th>
                     <th className="px-4 py-2">Reviews</th>
                     <th className="px-4 py-2">Website</th>
@@ -282,13 +288,13 @@ const Output3 = () => {
                 <tbody>
                   {data.map((service, index) => (
                     <tr key={index} className="hover:bg-gray-100">
-                      <td className="px-4 py-2">{service["Service Description"]}</td>
-                      <td className="px-4 py-2">{service.Price}</td>
-                      <td className="px-4 py-2">{service.Rating}</td>
-                      <td className="px-4 py-2">{service.Reviews}</td>
+                      <td className="px-4 py-2">{service.service_provider}</td>
+                      <td className="px-4 py-2">{service.specialization}</td>
+                      <td className="px-4 py-2">{service.rating}</td>
+                      <td className="px-4 py-2">{service.reviews}</td>
                       <td className="px-4 py-2">
                         <a
-                          href={service.Website}
+                          href={service.website}
                           target="_blank"
                           rel="noopener noreferrer"
                           className="text-blue-500 hover:underline"
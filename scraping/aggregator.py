@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from collector import ResultCollector
+from history import get_history
+from metrics import SOURCE_SECONDS
+from records import ProductBatch
+from sources import sources_for
+
+# Overall latency budget for one benchmark request, in seconds
+TOTAL_BUDGET = 6.0
+
+
+async def _run_source(source, query):
+    started = time.perf_counter()
+    try:
+        results = await asyncio.wait_for(source.search(query), timeout=source.deadline)
+        status = "ok" if results else "empty"
+        error = None
+        history = get_history()
+        if results and history is not None:
+            # Queued only; the history writer thread does the disk work
+            history.record(query.item_name, results, source.label)
+    except asyncio.TimeoutError:
+        results, status, error = [], "timeout", f"exceeded {source.deadline}s deadline"
+    except Exception as e:
+        results, status, error = [], "error", str(e)
+
+    elapsed = time.perf_counter() - started
+    SOURCE_SECONDS.observe(elapsed, source=source.name, status=status)
+    report = {
+        "source": source.label,
+        "status": status,
+        "results": len(results),
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+    if error:
+        report["error"] = error
+    return results, report
+
+
+async def aggregate_iter(query, kind, budget=TOTAL_BUDGET):
+    """
+    Query every source registered for `kind` concurrently, yielding as they finish.
+
+    Yields (source, results, report) in completion order. Each source runs
+    under its own deadline and the whole fan-out under `budget`; sources
+    still running when the budget is spent are cancelled and reported as
+    timed out.
+    """
+    sources = sources_for(kind, query.category)
+    tasks = {asyncio.ensure_future(_run_source(source, query)): source for source in sources}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                results, report = task.result()
+                yield tasks[task], results, report
+
+        for task in pending:
+            source = tasks[task]
+            yield source, [], {
+                "source": source.label,
+                "status": "timeout",
+                "results": 0,
+                "error": f"exceeded {budget}s request budget",
+            }
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def aggregate(query, kind, budget=TOTAL_BUDGET):
+    """
+    Run the fan-out to completion and merge the results.
+
+    Whatever finished within `budget` is deduplicated in registry order, so
+    the merged list does not depend on which source answered first.
+    Returns (ProductBatch, per-source status).
+    """
+    finished = {}
+    async for source, results, report in aggregate_iter(query, kind, budget):
+        finished[source.name] = (results, report)
+
+    merged = ResultCollector()
+    status = {}
+    for source in sources_for(kind, query.category):
+        results, status[source.name] = finished[source.name]
+        merged.extend(results)
+
+    return ProductBatch(merged.results()), status
@@ -0,0 +1,41 @@
+import asyncio
+
+# Line items of one batch that may be searched at the same time
+BATCH_CONCURRENCY = 16
+MAX_BATCH_ITEMS = 500
+
+
+async def run_bounded(items, handler, concurrency=BATCH_CONCURRENCY):
+    """
+    Run `handler(item)` for every item with at most `concurrency` in flight.
+
+    Yields (index, result, error) as each item finishes, in completion
+    order, so callers can stream results while slower items are still
+    running. New items are only started as earlier ones complete, and
+    anything still running is cancelled if the consumer stops early.
+    """
+    pending = iter(enumerate(items))
+    in_flight = {}
+
+    def start_more():
+        while len(in_flight) < concurrency:
+            try:
+                index, item = next(pending)
+            except StopIteration:
+                return
+            in_flight[asyncio.ensure_future(handler(item))] = index
+
+    try:
+        start_more()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = in_flight.pop(task)
+                try:
+                    yield index, task.result(), None
+                except Exception as e:
+                    yield index, None, e
+            start_more()
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -0,0 +1,142 @@
+"""
+Offline check of the browser pool, with a fake Chromium standing in for pyppeteer.
+
+    python bench/browser_check.py
+
+Renders the recorded Google Shopping page through `BrowserPool.render_html`
+with the launcher swapped for an in-process fake, and checks that pages are
+recycled after `max_uses` renders, that a failed render or a failed page
+replacement never shrinks the pool, and that the pool keeps serving
+afterwards. Exits non-zero on the first failed check.
+"""
+import asyncio
+import os
+import sys
+
+import common  # noqa: F401  (puts the scraping modules on sys.path)
+from fixture_server import load_fixture
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from browser import BrowserPool
+
+POOL_SIZE = 2
+MAX_USES = 3
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.html = ""
+
+    async def setRequestInterception(self, enabled):
+        pass
+
+    def on(self, event, handler):
+        pass
+
+    async def setContent(self, html):
+        if self.browser.fail_renders:
+            self.browser.fail_renders -= 1
+            raise RuntimeError("page crashed")
+        self.html = html
+
+    async def waitForSelector(self, selector, timeout=None):
+        pass
+
+    async def content(self):
+        return self.html
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def newPage(self):
+        if self.browser.fail_pages:
+            self.browser.fail_pages -= 1
+            raise RuntimeError("newPage failed")
+        self.browser.pages_opened += 1
+        return FakePage(self.browser)
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    """Counts opened pages; `fail_renders` / `fail_pages` make the next calls raise"""
+
+    process = None
+
+    def __init__(self):
+        self.pages_opened = 0
+        self.fail_renders = 0
+        self.fail_pages = 0
+
+    async def createIncognitoBrowserContext(self):
+        return FakeContext(self)
+
+    async def close(self):
+        pass
+
+
+def check(condition, message):
+    if not condition:
+        print(f"FAIL {message}")
+        sys.exit(1)
+    print(f"ok   {message}")
+
+
+async def run():
+    browser = FakeBrowser()
+
+    async def launcher(**options):
+        return browser
+
+    html = load_fixture("google_shopping.html")
+    pool = BrowserPool(size=POOL_SIZE, max_uses=MAX_USES, launcher=launcher)
+    await pool.start()
+    check(browser.pages_opened == POOL_SIZE, "start opens one page per slot")
+
+    for _ in range(POOL_SIZE * MAX_USES):
+        rendered = await pool.render_html(html, timeout=1.0)
+    check(rendered == html, "render_html returns the rendered fixture")
+    check(pool.counters["recycled"] == POOL_SIZE, f"every slot recycled after {MAX_USES} renders")
+    check(browser.pages_opened == POOL_SIZE * 2, "recycled slots get fresh pages")
+
+    # A render fails and so does opening the page that should replace it
+    browser.fail_renders, browser.fail_pages = 1, 1
+    try:
+        await pool.render_html(html, timeout=1.0)
+    except RuntimeError:
+        pass
+    check(pool.counters["recycle_failures"] == 1, "failed replacement is counted")
+    check(pool.stats()["idle"] == POOL_SIZE, "pool keeps its size after a failed replacement")
+
+    # Every slot is borrowed in turn; the empty one is replaced on its next use
+    for _ in range(POOL_SIZE * MAX_USES):
+        rendered = await pool.render_html(html, timeout=1.0)
+    check(rendered == html, "pool keeps rendering after the failure")
+    check(pool.stats()["idle"] == POOL_SIZE, "every slot is back in the pool")
+
+    # A browser that can open no pages at all: renders fail fast instead of hanging
+    browser.fail_pages = POOL_SIZE * 10
+    for _ in range(POOL_SIZE * MAX_USES + 1):
+        try:
+            await asyncio.wait_for(pool.render_html(html, timeout=1.0), 5.0)
+        except RuntimeError:
+            pass
+    check(pool.stats()["idle"] == POOL_SIZE, "slots are not lost while no page can be opened")
+    browser.fail_pages = 0
+    rendered = await asyncio.wait_for(pool.render_html(html, timeout=1.0), 5.0)
+    check(rendered == html, "pool recovers once pages open again")
+
+    await pool.close()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Shared reporting helpers for the micro and load benchmarks"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Benchmarks import the service modules the way server.py does
+if SCRAPING_DIR not in sys.path:
+    sys.path.insert(0, SCRAPING_DIR)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, scale=1.0, digits=3):
+    """count / mean / p50 / p95 / p99 / max of timing samples, multiplied by `scale`"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered) * scale, digits),
+        "p50": round(percentile(ordered, 0.50) * scale, digits),
+        "p95": round(percentile(ordered, 0.95) * scale, digits),
+        "p99": round(percentile(ordered, 0.99) * scale, digits),
+        "max": round(ordered[-1] * scale, digits),
+    }
+
+
+def metadata():
+    """Where and on what code a report was produced, for comparing runs"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRAPING_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_report(report, output=None):
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def _lookup(result, key):
+    for part in key.split("."):
+        if not isinstance(result, dict):
+            return None
+        result = result.get(part)
+    return result
+
+
+def compare(report, baseline_path, key):
+    """
+    Attach `change` = current / baseline value of `key` ("p50", "latency_ms.p95")
+    to each result present in both reports; above 1.0 means slower.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    for name, result in report["results"].items():
+        before = _lookup(baseline.get(name, {}), key)
+        now = _lookup(result, key)
+        if before and now is not None:
+            result["change"] = round(now / before, 3)
@@ -0,0 +1,151 @@
+"""
+Local stand-in for the scraped sites, serving the recorded fixtures.
+
+    python bench/fixture_server.py --port 8765 --latency 50
+
+Routes mirror the real sites closely enough for the scrapers' URL builders:
+
+    /search?q=...&tbm=shop          Google Shopping results
+    /catalogsearch/result/?q=&p=N   BuildersMart catalogue, PAGES pages
+    /<location>/<description>/      JustDial listing
+    /api/product/search, /catalog   Express retailer API (JSON)
+
+Pages carry an ETag and answer If-None-Match with 304, like the real sites.
+`env(base)` gives the variables that point the scrapers at a running server.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Catalogue pages the BuildersMart stand-in paginates over
+PAGES = 3
+RETAILER_PRODUCTS = [
+    {"name": "Dell Latitude 5440 Laptop 16 GB RAM 512 GB SSD", "discountPrice": 68500, "description": "Intel Core i5, 14 inch",
+     "tags": "laptop business", "shopId": {"name": "City Computers"}},
+    {"name": "HP LaserJet Pro M126nw Printer", "discountPrice": 17999, "description": "Multifunction, wireless",
+     "tags": "printer office", "shopId": {"name": "Office Mart"}},
+    {"name": "UltraTech OPC 53 Grade Cement 50 kg", "discountPrice": 410, "description": "Bag",
+     "tags": "cement construction", "shopId": {"name": "Sai Building Materials"}},
+]
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def buildersmart_page(template, query, page):
+    links = "".join(
+        f'<a href="/catalogsearch/result/?q={query}&amp;p={number}">{number}</a>' for number in range(1, PAGES + 1)
+    )
+    if page < PAGES:
+        links += f'<a class="next i-next" href="/catalogsearch/result/?q={query}&amp;p={page + 1}">Next</a>'
+    return template.replace("{query}", query).replace("{page}", str(page)).replace("{pager}", links)
+
+
+def env(base):
+    """Environment variables pointing every scraper at a fixture server on `base`"""
+    return {
+        "GOOGLE_SHOPPING_URL": f"{base}/search",
+        "BUILDERSMART_URL": f"{base}/catalogsearch/result/",
+        "JUSTDIAL_URL": base,
+        "RETAILER_API_URL": f"{base}/api/product/search",
+        "RETAILER_CATALOG_URL": f"{base}/api/product/catalog",
+    }
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Set on the server class: seconds of simulated upstream latency per request
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/search":
+            self.send_page(self.server.fixtures["google_shopping"])
+        elif url.path.startswith("/catalogsearch/result"):
+            page = int(params.get("p", 1))
+            if page > PAGES:
+                self.send_page("<html><body><p class='note-msg'>No products</p></body></html>")
+            else:
+                self.send_page(buildersmart_page(self.server.fixtures["buildersmart"], params.get("q", ""), page))
+        elif url.path == "/api/product/search":
+            self.send_json({"products": RETAILER_PRODUCTS})
+        elif url.path == "/api/product/catalog":
+            skip = int(params.get("skip", 0))
+            self.send_json({"products": RETAILER_PRODUCTS[skip:skip + int(params.get("limit", 500))]})
+        elif url.path.count("/") >= 2:
+            self.send_page(self.server.fixtures["justdial"])
+        else:
+            self.send_error(404)
+
+    def send_page(self, text):
+        body = text.encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_body(body, "text/html; charset=utf-8", etag)
+
+    def send_json(self, value):
+        self.send_body(json.dumps(value).encode(), "application/json")
+
+    def send_body(self, body, content_type, etag=None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0):
+        handler = type("Handler", (FixtureHandler,), {"latency": latency})
+        super().__init__(("127.0.0.1", port), handler)
+        self.fixtures = {
+            name: load_fixture(f"{name}.html") for name in ("google_shopping", "buildersmart", "justdial")
+        }
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        """Serve from a daemon thread; returns self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded scraper fixtures locally")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated upstream latency in ms")
+    args = parser.parse_args()
+    server = FixtureServer(args.port, args.latency / 1000)
+    print(f"Serving fixtures on {server.base_url}")
+    for name, value in env(server.base_url).items():
+        print(f"  export {name}={value}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Load test for the FastAPI service, against the local fixture server.
+
+    python bench/load.py --concurrency 32 --requests 500 -o load.json
+    python bench/load.py --url http://127.0.0.1:8000 --scenario specs
+
+By default the app runs in-process (httpx ASGI transport, lifespan included)
+with every scraper pointed at a fixture server started here, so no network
+is touched; the client then shares the event loop with the app. With
+`--url` an already running server is driven instead - start it with the
+variables printed by `python bench/fixture_server.py`.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+
+import common  # noqa: F401  (puts the scraping modules on sys.path)
+from common import summarize, metadata, write_report, compare
+from fixture_server import FixtureServer, env
+
+SPECS = [{"specification_name": "RAM", "value": "16 GB"}]
+POPULAR = ["Laptop", "Printer", "Monitor", "Projector", "Desktop"]
+
+
+def scenarios():
+    """name -> function(i) returning (method, path, json body) for the i-th request"""
+    return {
+        # A handful of repeated searches: mostly result-cache hits
+        "make_model_hot": lambda i: (
+            "POST", "/scrape-make-model/electronics", {"item_name": POPULAR[i % len(POPULAR)], "seller": "HP"}
+        ),
+        # Every request a new construction search: a full BuildersMart crawl per request
+        "make_model_cold": lambda i: (
+            "POST", "/scrape-make-model/construction", {"item_name": f"Cement {i}", "seller": "UltraTech"}
+        ),
+        # New spec searches: Google Shopping page fetch, parse and spec filtering, or the spec index
+        "specs": lambda i: ("POST", "/scrape-specs/electronics", {"item_name": f"Laptop {i}", "specifications": SPECS}),
+        "service_providers": lambda i: (
+            "POST", "/scrape-service-providers/electrical", {"location": "Mumbai", "services": ["Wiring"]}
+        ),
+    }
+
+
+async def drive(client, build, total, concurrency, duration):
+    """Issue `total` requests (or run for `duration` seconds) from `concurrency` workers"""
+    counter = itertools.count()
+    latencies = []
+    statuses = {}
+    errors = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if (deadline is None and i >= total) or (deadline is not None and time.perf_counter() >= deadline):
+                return
+            method, path, body = build(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                await response.aread()
+                status = response.status_code
+            except Exception:
+                status = "error"
+            latencies.append(time.perf_counter() - started)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status == "error" or status >= 500:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": statuses,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": summarize(latencies, scale=1e3),
+    }
+
+
+async def run(args, names):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(30.0)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout)
+        lifespan = None
+    else:
+        # Imported only now, after the environment points every source at the fixture server
+        from server import app
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", limits=limits, timeout=timeout
+        )
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    results = {}
+    try:
+        for name in names:
+            build = scenarios()[name]
+            # Warm connection pools, parsers and the hot cache entries outside the measurement
+            await drive(client, build, min(args.warmup, args.requests), min(args.concurrency, 4), None)
+            results[name] = await drive(client, build, args.requests, args.concurrency, args.duration)
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the scraping API at a target concurrency")
+    parser.add_argument("--scenario", action="append", choices=sorted(scenarios()),
+                        help="scenario to run (repeatable; default all)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--duration", type=float, help="run each scenario for this many seconds instead")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=20.0, help="simulated upstream latency in ms")
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare p95 latencies against")
+    args = parser.parse_args()
+
+    names = args.scenario or sorted(scenarios())
+    fixtures = None
+    workdir = tempfile.TemporaryDirectory(prefix="scraper-bench-")
+    if not args.url:
+        fixtures = FixtureServer(latency=args.latency / 1000).start()
+        os.environ.update(env(fixtures.base_url))
+        # Keep databases out of the working tree and the background jobs out of the numbers
+        os.environ.setdefault("PRICE_HISTORY_DB", os.path.join(workdir.name, "history.db"))
+        os.environ.setdefault("SCRAPER_HTTP_CACHE", os.path.join(workdir.name, "http_cache.db"))
+        os.environ.setdefault("PRICE_MODEL", "")
+        os.environ.setdefault("PREWARM_TOP_N", "0")
+        os.environ.setdefault("RETAILER_SYNC_INTERVAL", "3600")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    try:
+        results = asyncio.run(run(args, names))
+    finally:
+        if fixtures is not None:
+            fixtures.shutdown()
+        workdir.cleanup()
+
+    report = {
+        "benchmark": "load",
+        "meta": {**metadata(), "target": args.url or "in-process", "upstream_latency_ms": args.latency},
+        "results": results,
+    }
+    if args.baseline:
+        compare(report, args.baseline, "latency_ms.p95")
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
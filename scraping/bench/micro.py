@@ -0,0 +1,141 @@
+"""
+Microbenchmarks for the scraping hot path, run against the recorded fixtures.
+
+    python bench/micro.py                          # JSON report on stdout
+    python bench/micro.py -o micro.json --baseline old.json --filter parse
+
+Each benchmark is timed call by call until `--min-time` seconds have passed
+(and at least `--min-runs` calls); latencies are reported in microseconds.
+"""
+import argparse
+import gc
+import os
+import random
+import time
+
+import common  # noqa: F401  (puts the scraping modules on sys.path)
+from common import summarize, metadata, write_report, compare
+
+# Page cache and history would turn repeat parses into lookups and disk writes
+os.environ["SCRAPER_HTTP_CACHE"] = ""
+os.environ["PRICE_HISTORY_DB"] = ""
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import orjson
+
+from cache import make_cache_key
+from collector import ResultCollector
+from extract import get_extractor, load_schemas
+from fixture_server import load_fixture, buildersmart_page
+from google_specs import parse_results_page
+from pricing import annotate_batch
+from records import ProductRecord, ProductBatch
+from specindex import SpecIndex
+from test import parse_page
+
+SPECS = [{"specification_name": "RAM", "value": "16 GB"}]
+# Rows in the synthetic batch used by the dedupe / normalize / serialize benchmarks
+BATCH_SIZE = 1000
+
+
+def synthetic_rows(count, seed=7):
+    """Display-string rows shaped like scraper output, a fifth of them near-duplicates"""
+    rng = random.Random(seed)
+    brands = ["Dell", "HP", "Lenovo", "Asus", "Acer"]
+    rows = []
+    for i in range(count):
+        if rows and rng.random() < 0.2:
+            name, seller, *rest = rng.choice(rows)
+            rows.append((name.upper() + " ", seller, *rest))
+            continue
+        rows.append((
+            f"{rng.choice(brands)} Laptop {i} {rng.choice(['8 GB', '16 GB'])} RAM",
+            rng.choice(["Croma", "Amazon.in", "Flipkart", "Vijay Sales"]),
+            f"₹{rng.randint(20000, 150000):,}.00",
+            f"{rng.uniform(3, 5):.1f}",
+            f"({rng.randint(1, 5000):,})",
+        ))
+    return rows
+
+
+def build_benchmarks():
+    google_html = load_fixture("google_shopping.html")
+    google_bytes = google_html.encode()
+    builders_html = buildersmart_page(load_fixture("buildersmart.html"), "cement", 1).encode()
+    justdial_html = load_fixture("justdial.html").encode()
+    rows = synthetic_rows(BATCH_SIZE)
+    records = [
+        ProductRecord.from_display(name, seller, price, rating=rating, reviews=reviews, source="Bench")
+        for name, seller, price, rating, reviews in rows
+    ]
+
+    def dedupe():
+        collector = ResultCollector()
+        for record in records:
+            collector.add(record)
+        return collector.results()
+
+    unique = ProductBatch(dedupe())
+    scored = ProductBatch(list(unique))
+    annotate_batch(scored)
+    index = SpecIndex()
+    index.add_batch(unique, "electronics")
+
+    benchmarks = {
+        "parse.google_shopping": lambda: get_extractor("google_shopping").extract(google_bytes),
+        "parse.buildersmart": lambda: parse_page(builders_html, None, None, ResultCollector()),
+        "parse.google_specs_results": lambda: parse_results_page(google_bytes, SPECS),
+        "normalize.from_display": lambda: [
+            ProductRecord.from_display(name, seller, price, rating=rating, reviews=reviews)
+            for name, seller, price, rating, reviews in rows
+        ],
+        "dedupe.collector": dedupe,
+        "normalize.annotate_batch": lambda: annotate_batch(ProductBatch(list(unique))),
+        "serialize.to_dicts": scored.to_dicts,
+        "serialize.orjson": lambda: orjson.dumps(scored.to_dicts()),
+        "serialize.state_roundtrip": lambda: ProductBatch.from_state(orjson.loads(orjson.dumps(scored.to_state()))),
+        "cache.make_key": lambda: make_cache_key("specs", "electronics", "Laptop", specifications=SPECS),
+        "index.search": lambda: index.search("laptop", SPECS, "electronics"),
+    }
+    # Sites gain a benchmark as soon as their schema exists
+    if "justdial" in load_schemas():
+        benchmarks["parse.justdial"] = lambda: get_extractor("justdial").extract(justdial_html)
+    return benchmarks
+
+
+def run(function, min_time, min_runs):
+    for _ in range(3):
+        function()
+    samples = []
+    gc.collect()
+    deadline = time.perf_counter() + min_time
+    while len(samples) < min_runs or time.perf_counter() < deadline:
+        started = time.perf_counter_ns()
+        function()
+        samples.append(time.perf_counter_ns() - started)
+    result = summarize(samples, scale=1e-3)
+    result["ops_per_sec"] = round(len(samples) / (sum(samples) / 1e9), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraping hot-path microbenchmarks")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent per benchmark")
+    parser.add_argument("--min-runs", type=int, default=20)
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare p50 latencies against")
+    args = parser.parse_args()
+
+    results = {}
+    for name, function in build_benchmarks().items():
+        if args.filter in name:
+            results[name] = run(function, args.min_time, args.min_runs)
+    report = {"benchmark": "micro", "unit": "us", "meta": metadata(), "results": results}
+    if args.baseline:
+        compare(report, args.baseline, "p50")
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
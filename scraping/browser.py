@@ -0,0 +1,225 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from engine import get_policy
+from logs import get_logger
+
+# Warm pages kept open, and how many renders one page serves before it is replaced
+BROWSER_PAGES = int(os.environ.get("BROWSER_PAGES", 4))
+PAGE_MAX_USES = int(os.environ.get("BROWSER_PAGE_MAX_USES", 50))
+RENDER_TIMEOUT = 15.0
+# System Chromium to launch instead of the revision pyppeteer downloads on first use
+BROWSER_EXECUTABLE = os.environ.get("BROWSER_EXECUTABLE") or None
+# Resource types never downloaded: only the DOM and scripts matter for extraction
+BLOCKED_RESOURCES = frozenset({"image", "media", "font", "stylesheet"})
+LAUNCH_ARGS = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--disable-extensions"]
+
+log = get_logger("browser")
+
+
+class PageSlot:
+    """One warm page in its own incognito context, with a use count"""
+
+    __slots__ = ("context", "page", "uses", "healthy")
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.healthy = True
+
+
+class BrowserPool:
+    """
+    Pool of warm headless Chromium pages for JS-rendered sources.
+
+    One browser is launched lazily and shared; each slot is a page in its
+    own incognito context with request interception that aborts images,
+    media, fonts and stylesheets. At most `size` renders run at once.
+    A page is recycled (context closed, a fresh one opened) after
+    `max_uses` renders or any failure, and the whole browser is
+    relaunched if it disconnects. A slot whose replacement fails stays in
+    the pool empty and is retried by its next borrower; waiting for a free
+    page is bounded by the render timeout.
+    """
+
+    def __init__(self, size=BROWSER_PAGES, max_uses=PAGE_MAX_USES, launcher=None):
+        self.size = size
+        self.max_uses = max_uses
+        self._launcher = launcher
+        self._browser = None
+        self._idle = None
+        self._start_lock = asyncio.Lock()
+        self.counters = {"renders": 0, "failures": 0, "recycled": 0, "recycle_failures": 0, "launches": 0}
+
+    async def _launch(self):
+        if self._launcher is None:
+            try:
+                from pyppeteer import launch
+            except ImportError as e:
+                raise RuntimeError("pyppeteer is not installed; pip install -r requirements.txt") from e
+            self._launcher = launch
+        self.counters["launches"] += 1
+        options = {"executablePath": BROWSER_EXECUTABLE} if BROWSER_EXECUTABLE else {}
+        return await self._launcher(
+            headless=True,
+            **options,
+            args=LAUNCH_ARGS,
+            # The server installs its own signal handlers
+            handleSIGINT=False,
+            handleSIGTERM=False,
+            handleSIGHUP=False,
+        )
+
+    async def _open_slot(self):
+        context = await self._browser.createIncognitoBrowserContext()
+        page = await context.newPage()
+        await page.setRequestInterception(True)
+
+        async def intercept(request):
+            if request.resourceType in BLOCKED_RESOURCES:
+                await request.abort()
+            else:
+                await request.continue_()
+
+        page.on("request", lambda request: asyncio.ensure_future(intercept(request)))
+        return PageSlot(context, page)
+
+    async def start(self):
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            self._browser = await self._launch()
+            idle = asyncio.Queue()
+            for slot in await asyncio.gather(*(self._open_slot() for _ in range(self.size))):
+                idle.put_nowait(slot)
+            self._idle = idle
+
+    async def _recycle(self, slot):
+        self.counters["recycled"] += 1
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        if not self._browser_alive():
+            async with self._start_lock:
+                if not self._browser_alive():
+                    try:
+                        await self._browser.close()
+                    except Exception:
+                        pass
+                    self._browser = await self._launch()
+        return await self._open_slot()
+
+    def _browser_alive(self):
+        process = getattr(self._browser, "process", None)
+        return process is None or process.poll() is None
+
+    async def _replace(self, slot):
+        """A fresh slot for `slot`, or an empty unhealthy one if no page could be opened"""
+        try:
+            return await self._recycle(slot)
+        except Exception as e:
+            self.counters["recycle_failures"] += 1
+            log.warning(f"⚠️ Could not replace a browser page: {e}")
+            # Keeps the pool at full size; the next borrower retries the replacement
+            broken = PageSlot(None, None)
+            broken.healthy = False
+            return broken
+
+    @asynccontextmanager
+    async def page(self, timeout=RENDER_TIMEOUT):
+        """Borrow a page; it goes back to the pool (or is replaced) on exit"""
+        if self._idle is None:
+            await self.start()
+        slot = await asyncio.wait_for(self._idle.get(), timeout)
+        if slot.page is None:
+            slot = await asyncio.shield(self._replace(slot))
+            if slot.page is None:
+                self._idle.put_nowait(slot)
+                raise RuntimeError("no browser page available")
+        try:
+            slot.uses += 1
+            yield slot.page
+        except BaseException:
+            slot.healthy = False
+            raise
+        finally:
+            if not slot.healthy or slot.uses >= self.max_uses:
+                # Recycling must not be lost to the borrower's cancellation
+                slot = await asyncio.shield(self._replace(slot))
+            self._idle.put_nowait(slot)
+
+    async def render(self, url, wait_for=None, timeout=RENDER_TIMEOUT, source=None):
+        """
+        HTML of a page after its scripts ran (and `wait_for` matched, if given).
+
+        Navigations obey the same host pacing and per-source circuit breaker
+        as plain fetches.
+        """
+        policy = get_policy()
+        host, breaker = policy.admit(url, source)
+        bucket = policy.bucket(host)
+        async with self.page(timeout) as page:
+            delay = bucket.reserve() if bucket is not None else 0.0
+            if delay:
+                policy.counters["throttled"] += 1
+                await asyncio.sleep(delay)
+            try:
+                await page.goto(url, waitUntil="domcontentloaded", timeout=timeout * 1000)
+                if wait_for:
+                    await page.waitForSelector(wait_for, timeout=timeout * 1000)
+                html = await page.content()
+            except Exception:
+                self.counters["failures"] += 1
+                breaker.record(False)
+                raise
+        breaker.record(True)
+        self.counters["renders"] += 1
+        return html
+
+    async def render_html(self, html, wait_for=None, timeout=RENDER_TIMEOUT):
+        """Run a local HTML document (a saved fixture) through a page and return the rendered DOM"""
+        async with self.page(timeout) as page:
+            await page.setContent(html)
+            if wait_for:
+                await page.waitForSelector(wait_for, timeout=timeout * 1000)
+            rendered = await page.content()
+        self.counters["renders"] += 1
+        return rendered
+
+    def stats(self):
+        return {
+            **self.counters,
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle is not None else None,
+        }
+
+    async def close(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        self._browser = None
+        self._idle = None
+
+
+_pool = None
+
+
+def get_browser_pool():
+    """Process-wide browser pool; the browser itself starts on first use"""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
+
+
+async def close_browser_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from logs import get_logger
+from shmcache import open_tier
+
+log = get_logger("cache")
+
+# Fresh lifetime of a cached search, in seconds
+DEFAULT_TTL = 15 * 60
+# How long past expiry a stale entry may still be served while it refreshes
+STALE_TTL = 60 * 60
+MAX_ENTRIES = 2048
+# Optional SQLite file shared by every uvicorn worker on the host
+CACHE_DB = os.environ.get("SCRAPE_CACHE_DB")
+# Optional mmap'd file shared by preforked workers (see serve.py); takes precedence over CACHE_DB
+SHARED_CACHE = os.environ.get("SCRAPE_SHARED_CACHE")
+
+
+def _normalize(value):
+    return " ".join(str(value).lower().split()) if value else ""
+
+
+def make_cache_key(kind, category, item_name, seller=None, model=None, specifications=None):
+    """Stable key for a search, insensitive to case, spacing and spec order"""
+    specs = sorted(
+        (_normalize(spec.get("specification_name")), _normalize(spec.get("value")))
+        for spec in specifications or []
+    )
+    return json.dumps(
+        [kind, _normalize(category), _normalize(item_name), _normalize(seller), _normalize(model), specs],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
+class SQLiteTier:
+    """
+    On-disk cache tier; WAL mode lets several worker processes share one file.
+
+    A connection must not cross a fork, so a process that inherited the
+    tier from its parent opens its own on first use.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            self._connect()
+        return self._conn
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, stored_at FROM scrape_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def stored_at(self, key):
+        """When the entry was stored, or None; the value is not read"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT stored_at FROM scrape_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def set(self, key, value, stored_at):
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, payload, stored_at),
+            )
+            conn.commit()
+
+    def purge(self, older_than):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM scrape_cache WHERE stored_at < ?", (older_than,))
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """
+    Two-tier search result cache.
+
+    Tier one is an in-process LRU with TTL; tier two is optional and shared
+    across workers: an mmap'd set-associative file or a SQLite file. Entries past their TTL but inside the stale
+    window are served immediately while a background task refreshes them.
+    `encode`/`decode` convert values to and from JSON-able form for the
+    disk tier; the memory tier keeps the objects as they are.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=DEFAULT_TTL, stale_ttl=STALE_TTL, db_path=CACHE_DB,
+                 shared_path=SHARED_CACHE, encode=None, decode=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        if shared_path:
+            self._disk = open_tier(shared_path)
+        else:
+            self._disk = SQLiteTier(db_path) if db_path else None
+        self._refreshing = {}
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.counters = {
+            "hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+        }
+
+    def _remember(self, key, value, stored_at):
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    async def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry, False
+        if self._disk is not None:
+            entry = await asyncio.to_thread(self._disk.get, key)
+            if entry is not None and time.time() - entry[1] < self.ttl + self.stale_ttl:
+                entry = self.decode(entry[0]), entry[1]
+                self._remember(key, *entry)
+                return entry, True
+        return None, False
+
+    async def store(self, key, value):
+        stored_at = time.time()
+        self._remember(key, value, stored_at)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, self.encode(value), stored_at)
+
+    async def get_fresh(self, key):
+        """Return the value if a fresh entry exists, otherwise None (counted as a miss)"""
+        entry, from_disk = await self._lookup(key)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            self.counters["disk_hits" if from_disk else "hits"] += 1
+            return entry[0]
+        self.counters["misses"] += 1
+        return None
+
+    async def get_or_load(self, key, loader, cacheable=bool):
+        """
+        Return (value, state) where state is "hit", "stale" or "miss".
+
+        `loader` is an async callable producing a fresh value; values for
+        which `cacheable(value)` is false are returned but not stored.
+        """
+        entry, from_disk = await self._lookup(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self.counters["disk_hits" if from_disk else "hits"] += 1
+                return value, "hit"
+            if age < self.ttl + self.stale_ttl:
+                self.counters["stale_hits"] += 1
+                self._schedule_refresh(key, loader, cacheable)
+                return value, "stale"
+            self._entries.pop(key, None)
+
+        self.counters["misses"] += 1
+        value = await loader()
+        if cacheable(value):
+            await self.store(key, value)
+        return value, "miss"
+
+    async def age(self, key):
+        """
+        Seconds since the entry was stored, or None if it is not cached.
+
+        A peek: not counted as a lookup, and neither refreshes the entry's
+        LRU position nor copies it from the shared tier into memory.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at = entry[1]
+        elif self._disk is not None:
+            stored_at = await asyncio.to_thread(self._disk.stored_at, key)
+        else:
+            stored_at = None
+        return time.time() - stored_at if stored_at is not None else None
+
+    async def refresh(self, key, loader, cacheable=bool):
+        """Reload an entry now whatever its age, joining a refresh already in flight"""
+        self._schedule_refresh(key, loader, cacheable)
+        task = self._refreshing.get(key)
+        if task is not None:
+            await asyncio.shield(task)
+
+    def _schedule_refresh(self, key, loader, cacheable):
+        if key in self._refreshing:
+            return
+        self._refreshing[key] = asyncio.ensure_future(self._refresh(key, loader, cacheable))
+
+    async def _refresh(self, key, loader, cacheable):
+        try:
+            value = await loader()
+            if cacheable(value):
+                await self.store(key, value)
+            self.counters["refreshes"] += 1
+        except Exception as e:
+            self.counters["refresh_failures"] += 1
+            log.warning(f"❌ Background cache refresh failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    def stats(self):
+        lookups = self.counters["hits"] + self.counters["disk_hits"] + self.counters["stale_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "disk_tier": self._disk.path if self._disk is not None else None,
+        }
+
+    async def close(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        if self._disk is not None:
+            self._disk.purge(time.time() - self.ttl - self.stale_ttl)
+            self._disk.close()
+            self._disk = None
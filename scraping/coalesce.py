@@ -0,0 +1,48 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key starts the work as a task; everyone arriving
+    while it is in flight awaits the same task and gets the same result (or
+    exception). The task is shielded so a disconnecting client does not
+    cancel the scrape for the others.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.counters = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced": 0,
+        }
+
+    async def do(self, key, fn):
+        self.counters["calls"] += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        self.counters["executions"] += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter has gone away
+            task.exception()
+
+    def stats(self):
+        calls = self.counters["calls"]
+        return {
+            **self.counters,
+            "in_flight": len(self._inflight),
+            "coalescing_ratio": round(self.counters["coalesced"] / calls, 3) if calls else 0.0,
+        }
@@ -0,0 +1,81 @@
+import itertools
+import re
+import threading
+
+_NON_WORD = re.compile(r"[\W_]+")
+SHARDS = 16
+
+
+def normalize_identity(value):
+    """Case, spacing and punctuation insensitive form used to spot duplicates"""
+    return _NON_WORD.sub(" ", str(value or "").casefold()).strip()
+
+
+def dedupe_key(record):
+    return normalize_identity(record.name), normalize_identity(record.seller)
+
+
+class ResultCollector:
+    """
+    Thread-safe, de-duplicating result sink shared by the scrapers.
+
+    Products are indexed by their normalized (name, seller) pair in a set of
+    hashed shards, each with its own lock, so workers only contend when
+    they touch the same shard. Near-duplicates (same product differing only
+    in case, spacing or punctuation) are folded into the first one seen,
+    which picks up any fields it was missing.
+    An optional `limit` caps how many distinct products are kept.
+    """
+
+    def __init__(self, limit=None, shards=SHARDS):
+        self.limit = limit
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+        self._count_lock = threading.Lock()
+        self._count = 0
+        self._sequence = itertools.count()
+        self.folded = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def full(self):
+        return self.limit is not None and self._count >= self.limit
+
+    def _reserve(self):
+        with self._count_lock:
+            if self.full:
+                return False
+            self._count += 1
+            return True
+
+    def add(self, product):
+        """Add a ProductRecord; returns False if it was a duplicate or the collector is full"""
+        key = dedupe_key(product)
+        index, lock = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            if key in index:
+                index[key][1].fold(product)
+                with self._count_lock:
+                    self.folded += 1
+                return False
+            if not self._reserve():
+                return False
+            index[key] = (next(self._sequence), product)
+        return True
+
+    def extend(self, products):
+        for product in products:
+            if self.full:
+                break
+            self.add(product)
+        return self
+
+    def results(self):
+        """Collected products in insertion order"""
+        entries = []
+        for index, lock in self._shards:
+            with lock:
+                entries.extend(index.values())
+        entries.sort(key=lambda entry: entry[0])
+        return [product for _, product in entries]
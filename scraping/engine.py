@@ -0,0 +1,432 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from httpcache import get_http_cache, close_http_cache, DIGEST_HEADER, STATUS_HEADER
+from metrics import stage
+
+# Connection pool shared by every async scraper in the process
+MAX_CONNECTIONS = 200
+MAX_KEEPALIVE_CONNECTIONS = 50
+# Upper bound on simultaneous requests to a single upstream host
+PER_HOST_LIMIT = 8
+DEFAULT_TIMEOUT = 10.0
+
+# Token-bucket politeness limits: (requests per second, burst) per host
+DEFAULT_HOST_RATE = (5.0, PER_HOST_LIMIT)
+HOST_RATES = {
+    "www.google.co.uk": (1.0, 2),
+    "www.buildersmart.in": (4.0, 4),
+    "www.justdial.com": (2.0, 3),
+}
+# Our own services (the Express backend) are not paced
+UNPACED_HOSTS = frozenset({"localhost", "127.0.0.1", "::1"})
+# Retries for throttling, server errors and dropped connections
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 4.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Consecutive failed fetches that open a source's circuit, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_RESET = 30.0
+
+
+def parse_host_rates(value):
+    """Overrides like "www.example.com=2:4,api.example.com=10:20" (rate:burst)"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        host, _, limits = item.partition("=")
+        rate, _, burst = limits.partition(":")
+        rates[host.strip()] = (float(rate), int(burst or max(1, float(rate))))
+    return rates
+
+
+# Headers of a 304 that must not be copied onto the stored body
+_BODY_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+def _replay_headers(headers, digest):
+    replay = {name: value for name, value in headers.items() if name.lower() not in _BODY_HEADERS}
+    replay[DIGEST_HEADER] = digest
+    replay[STATUS_HEADER] = "revalidated"
+    return replay
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching while a source's circuit breaker is open"""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket usable from sync and async code.
+
+    `reserve()` takes a token and returns how long the caller must wait
+    before using it, letting the balance go negative so concurrent callers
+    queue up at the configured rate instead of bursting together.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `threshold` consecutive failures; after `reset`
+    seconds one trial request is let through (half-open) and its outcome
+    closes or re-opens the circuit. A trial that never reports back (its
+    request was cancelled) is replaced by another after `reset` seconds.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset = reset
+        self.failures = 0
+        self.opened_at = None
+        self._trial_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset else "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset and (self._trial_at is None or now - self._trial_at >= self.reset):
+                self._trial_at = now
+                return True
+            return False
+
+    def record(self, success):
+        with self._lock:
+            self._trial_at = None
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class FetchPolicy:
+    """
+    Politeness and resilience rules shared by the async engine and the sync facade.
+
+    Holds one token bucket per host and one circuit breaker per source
+    (defaulting to the host), and decides retry delays: full-jitter
+    exponential backoff, or the server's Retry-After when it sends one.
+    """
+
+    def __init__(self, host_rates=None, max_retries=MAX_RETRIES):
+        self.host_rates = {**HOST_RATES, **parse_host_rates(os.environ.get("SCRAPER_HOST_RATES")), **(host_rates or {})}
+        self.max_retries = max_retries
+        self._buckets = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "throttled": 0, "rejected": 0}
+
+    def bucket(self, host):
+        """Token bucket for a host, or None for hosts that are not paced"""
+        if urlsplit(f"//{host}").hostname in UNPACED_HOSTS:
+            return None
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(*self.host_rates.get(host, DEFAULT_HOST_RATE))
+            return bucket
+
+    def breaker(self, source):
+        with self._lock:
+            breaker = self._breakers.get(source)
+            if breaker is None:
+                breaker = self._breakers[source] = CircuitBreaker()
+            return breaker
+
+    def admit(self, url, source=None):
+        """(host, breaker) for a request, raising CircuitOpenError if the source is cut off"""
+        host = urlsplit(url).netloc
+        breaker = self.breaker(source or host)
+        if not breaker.allow():
+            self.counters["rejected"] += 1
+            raise CircuitOpenError(f"circuit open for {source or host} after {breaker.failures} failures")
+        self.counters["requests"] += 1
+        return host, breaker
+
+    def should_retry(self, attempt, status_code=None):
+        return attempt < self.max_retries and (status_code is None or status_code in RETRY_STATUSES)
+
+    def backoff(self, attempt, retry_after=None):
+        self.counters["retries"] += 1
+        if retry_after:
+            try:
+                return min(BACKOFF_CAP, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    def stats(self):
+        with self._lock:
+            breakers = {source: breaker.state for source, breaker in self._breakers.items()}
+            hosts = sorted(self._buckets)
+        return {**self.counters, "breakers": breakers, "hosts": hosts}
+
+
+class ScrapeEngine:
+    """
+    Native asyncio fetch layer for the scrapers.
+
+    One httpx.AsyncClient (and therefore one keep-alive connection pool) is
+    shared by every request, and each upstream host gets its own semaphore so
+    hundreds of searches can be in flight without hammering a single site.
+    Requests are paced by the shared FetchPolicy.
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, per_host_limit=PER_HOST_LIMIT,
+                 timeout=DEFAULT_TIMEOUT, policy=None):
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.policy = policy or get_policy()
+        self._client = None
+        self._host_limits = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=self.timeout,
+                follow_redirects=True,
+            )
+        return self._client
+
+    def _host_limit(self, host):
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return semaphore
+
+    async def fetch(self, url, headers=None, timeout=None, source=None, cache=True):
+        """
+        GET a url through the shared pool.
+
+        Waits for the host's token bucket, holds the per-host limit while the
+        request runs, and retries throttling, 5xx responses and transport
+        errors with backoff. The final outcome feeds the source's breaker.
+        With `cache`, the request is conditional on the stored copy and a
+        304 comes back as that copy with status 200.
+        """
+        with stage("fetch"):
+            return await self._fetch(url, headers, timeout, source, cache)
+
+    async def _fetch(self, url, headers, timeout, source, cache):
+        host, breaker = self.policy.admit(url, source)
+        bucket = self.policy.bucket(host)
+        page_cache = get_http_cache() if cache else None
+        entry = None
+        plain_headers = headers
+        if page_cache is not None:
+            conditional, entry = await asyncio.to_thread(page_cache.validators, url)
+            headers = {**(headers or {}), **conditional}
+        attempt = 0
+        while True:
+            delay = bucket.reserve() if bucket is not None else 0.0
+            if delay:
+                self.policy.counters["throttled"] += 1
+                await asyncio.sleep(delay)
+            try:
+                async with self._host_limit(host):
+                    response = await self.client.get(url, headers=headers, timeout=timeout or self.timeout)
+            except httpx.TransportError:
+                if not self.policy.should_retry(attempt):
+                    breaker.record(False)
+                    raise
+                await asyncio.sleep(self.policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and self.policy.should_retry(attempt, response.status_code):
+                await asyncio.sleep(self.policy.backoff(attempt, response.headers.get("Retry-After")))
+                attempt += 1
+                continue
+            breaker.record(response.status_code not in RETRY_STATUSES)
+            if page_cache is not None:
+                cached = await asyncio.to_thread(self._through_cache, page_cache, url, response, entry)
+                if cached is not None:
+                    return cached
+                # The stored copy was pruned while the request was out; fetch the page whole
+                headers, entry = plain_headers, None
+                continue
+            return response
+
+    @staticmethod
+    def _through_cache(page_cache, url, response, entry):
+        if response.status_code == 304 and entry is not None:
+            revalidated = page_cache.revalidated(url, entry)
+            if revalidated is None:
+                return None
+            body, digest = revalidated
+            return httpx.Response(
+                200, headers=_replay_headers(response.headers, digest), content=body, request=response.request
+            )
+        if response.status_code == 200:
+            response.headers[DIGEST_HEADER] = page_cache.store(url, response.headers, response.content)
+        return response
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_limits.clear()
+
+
+class SyncFetcher:
+    """
+    Blocking facade for the requests-based scrapers.
+
+    A keep-alive requests.Session sized for the thread pools that use it,
+    paced and retried by the same FetchPolicy as the async engine.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, policy=None):
+        self.timeout = timeout
+        self.policy = policy or get_policy()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=PER_HOST_LIMIT * 2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url, headers=None, timeout=None, source=None, cache=True):
+        with stage("fetch"):
+            return self._fetch(url, headers, timeout, source, cache)
+
+    def _fetch(self, url, headers, timeout, source, cache):
+        host, breaker = self.policy.admit(url, source)
+        bucket = self.policy.bucket(host)
+        page_cache = get_http_cache() if cache else None
+        entry = None
+        plain_headers = headers
+        if page_cache is not None:
+            conditional, entry = page_cache.validators(url)
+            headers = {**(headers or {}), **conditional}
+        attempt = 0
+        while True:
+            delay = bucket.reserve() if bucket is not None else 0.0
+            if delay:
+                self.policy.counters["throttled"] += 1
+                time.sleep(delay)
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self.policy.should_retry(attempt):
+                    breaker.record(False)
+                    raise
+                time.sleep(self.policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and self.policy.should_retry(attempt, response.status_code):
+                time.sleep(self.policy.backoff(attempt, response.headers.get("Retry-After")))
+                attempt += 1
+                continue
+            breaker.record(response.status_code not in RETRY_STATUSES)
+            if page_cache is not None:
+                cached = self._through_cache(page_cache, url, response, entry)
+                if cached is not None:
+                    return cached
+                # The stored copy was pruned while the request was out; fetch the page whole
+                headers, entry = plain_headers, None
+                continue
+            return response
+
+    @staticmethod
+    def _through_cache(page_cache, url, response, entry):
+        if response.status_code == 304 and entry is not None:
+            revalidated = page_cache.revalidated(url, entry)
+            if revalidated is None:
+                return None
+            body, digest = revalidated
+            replay = requests.Response()
+            replay.status_code = 200
+            replay._content = body
+            replay.headers = CaseInsensitiveDict(_replay_headers(response.headers, digest))
+            replay.url = response.url
+            replay.request = response.request
+            return replay
+        if response.status_code == 200:
+            response.headers[DIGEST_HEADER] = page_cache.store(url, response.headers, response.content)
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+_policy = None
+_engine = None
+_sync_fetcher = None
+_sync_lock = threading.Lock()
+
+
+def get_policy():
+    """Process-wide rate limits, retry rules and circuit breakers"""
+    global _policy
+    if _policy is None:
+        _policy = FetchPolicy()
+    return _policy
+
+
+def get_engine():
+    """Return the process-wide engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        _engine = ScrapeEngine()
+    return _engine
+
+
+def get_sync_fetcher():
+    """Return the process-wide blocking fetcher, creating it on first use"""
+    global _sync_fetcher
+    with _sync_lock:
+        if _sync_fetcher is None:
+            _sync_fetcher = SyncFetcher()
+        return _sync_fetcher
+
+
+async def close_engine():
+    global _engine, _sync_fetcher
+    if _engine is not None:
+        await _engine.close()
+        _engine = None
+    with _sync_lock:
+        if _sync_fetcher is not None:
+            _sync_fetcher.close()
+            _sync_fetcher = None
+    close_http_cache()
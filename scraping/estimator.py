@@ -0,0 +1,169 @@
+import argparse
+import os
+import sqlite3
+import time
+import zlib
+
+import numpy as np
+
+from collector import normalize_identity
+from history import HISTORY_DB, LEGACY_GENERATED
+from logs import get_logger
+
+# Serialized model loaded once per process; trained by `python estimator.py`
+PRICE_MODEL = os.environ.get("PRICE_MODEL", "price_model.npz")
+HASH_DIMS = 1024
+RIDGE_ALPHA = 1.0
+
+log = get_logger("estimator")
+# Observations needed before a model is worth writing
+MIN_OBSERVATIONS = 20
+# Half-width of the predicted range, in residual standard deviations
+RANGE_WIDTH = 1.0
+
+
+def tokens(text, seller=None):
+    """Word tokens of the item text plus a seller token"""
+    words = normalize_identity(text).split()
+    if seller:
+        words.append("seller=" + normalize_identity(seller))
+    return words
+
+
+def featurize(documents, dims=HASH_DIMS):
+    """
+    Hash (text, seller) pairs into a dense (n, dims) matrix.
+
+    Each distinct token adds +-1 at crc32(token) % dims, the sign taken
+    from the next hash bit so colliding tokens tend to cancel. Presence is
+    binary, so a repeated word counts once and a bare item name lands on
+    the same weights as the titles it was trained on.
+    """
+    matrix = np.zeros((len(documents), dims))
+    for row, (text, seller) in enumerate(documents):
+        for token in set(tokens(text, seller)):
+            h = zlib.crc32(token.encode())
+            matrix[row, h % dims] += 1.0 if (h // dims) & 1 else -1.0
+    return matrix
+
+
+class PriceEstimator:
+    """Ridge regression of log price on hashed item tokens"""
+
+    def __init__(self, weights, intercept, residual_std, observations, trained_at):
+        self.weights = weights
+        self.intercept = intercept
+        self.residual_std = residual_std
+        self.observations = observations
+        self.trained_at = trained_at
+
+    @property
+    def dims(self):
+        return self.weights.size
+
+    @classmethod
+    def fit(cls, documents, prices, alpha=RIDGE_ALPHA, dims=HASH_DIMS):
+        X = featurize(documents, dims)
+        y = np.log(np.asarray(prices, dtype=float))
+        intercept = y.mean()
+        # Closed-form ridge on the centred target: (X'X + aI) w = X'(y - b)
+        weights = np.linalg.solve(X.T @ X + alpha * np.eye(dims), X.T @ (y - intercept))
+        residual_std = float(np.std(y - intercept - X @ weights))
+        return cls(weights, float(intercept), residual_std, len(prices), time.time())
+
+    def predict(self, documents):
+        """Estimated prices (rupees) for a list of (text, seller) pairs"""
+        return np.exp(featurize(documents, self.dims) @ self.weights + self.intercept)
+
+    def predict_ranges(self, documents):
+        """(estimate, low, high) arrays; the range spans +-RANGE_WIDTH residual deviations"""
+        log_price = featurize(documents, self.dims) @ self.weights + self.intercept
+        spread = RANGE_WIDTH * self.residual_std
+        return np.exp(log_price), np.exp(log_price - spread), np.exp(log_price + spread)
+
+    def describe(self):
+        return {
+            "dims": self.dims,
+            "observations": self.observations,
+            "residual_std": round(self.residual_std, 4),
+            "trained_at": self.trained_at,
+        }
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            meta=np.array([self.intercept, self.residual_std, self.observations, self.trained_at]),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            intercept, residual_std, observations, trained_at = data["meta"]
+            return cls(data["weights"], float(intercept), float(residual_std), int(observations), float(trained_at))
+
+
+def load_observations(db_path):
+    """(documents, prices) of the real observations in the price history store"""
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(price_observations)")}
+        if "synthetic" in columns:
+            rows = conn.execute(
+                "SELECT item, product, seller, price_paise FROM price_observations "
+                "WHERE price_paise > 0 AND synthetic = 0"
+            ).fetchall()
+        else:
+            # A store the server has not opened since generated rows were flagged
+            clause, params = LEGACY_GENERATED
+            rows = conn.execute(
+                "SELECT item, product, seller, price_paise FROM price_observations "
+                f"WHERE price_paise > 0 AND NOT ({clause})",
+                params,
+            ).fetchall()
+    finally:
+        conn.close()
+    documents = [(f"{item} {product or ''}", seller) for item, product, seller, _ in rows]
+    prices = [price_paise / 100 for *_, price_paise in rows]
+    return documents, prices
+
+
+_estimator = None
+_loaded = False
+
+
+def get_estimator():
+    """Process-wide estimator loaded from PRICE_MODEL, or None if no model has been trained"""
+    global _estimator, _loaded
+    if not _loaded:
+        _loaded = True
+        if PRICE_MODEL and os.path.exists(PRICE_MODEL):
+            try:
+                _estimator = PriceEstimator.load(PRICE_MODEL)
+                log.info(f"✅ Loaded price model from {PRICE_MODEL} ({_estimator.observations} observations)")
+            except Exception as e:
+                log.error(f"❌ Could not load price model {PRICE_MODEL}: {e}")
+    return _estimator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the price estimator from the price history store")
+    parser.add_argument("--db", default=HISTORY_DB, help="price history SQLite file")
+    parser.add_argument("--out", default=PRICE_MODEL, help="where to write the model (.npz)")
+    parser.add_argument("--alpha", type=float, default=RIDGE_ALPHA, help="ridge regularization strength")
+    parser.add_argument("--dims", type=int, default=HASH_DIMS, help="hashed feature dimensions")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    documents, prices = load_observations(args.db)
+    if len(prices) < MIN_OBSERVATIONS:
+        raise SystemExit(f"Only {len(prices)} observations in {args.db}; need at least {MIN_OBSERVATIONS}")
+
+    estimator = PriceEstimator.fit(documents, prices, alpha=args.alpha, dims=args.dims)
+    estimator.save(args.out)
+    print(f"✅ Trained on {len(prices)} observations in {time.perf_counter() - started:.2f}s "
+          f"(residual std {estimator.residual_std:.3f} log-rupees) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import json
+import os
+import re
+
+from lxml import etree, html
+from lxml.cssselect import CSSSelector
+
+from httpcache import get_http_cache
+from metrics import stage
+
+# Per-site selector schemas; a layout change on a site only needs an edit here
+SCHEMA_PATH = os.environ.get(
+    "SCRAPER_SCHEMAS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_schemas.json")
+)
+
+_BY_PREFIX = re.compile(r"^\s*by\s+", re.IGNORECASE)
+
+# Named post-processing steps a schema field can refer to
+TRANSFORMS = {
+    # Google wraps outbound links as /url?url=<target>%...; keep the target host part
+    "redirect_target": lambda value: value.split("url=")[-1].split("%")[0],
+    "strip_by": lambda value: _BY_PREFIX.sub("", value).strip(),
+    # "1,204 Ratings" -> "1,204"
+    "first_word": lambda value: value.split(" ")[0],
+}
+
+
+def _compile_selector(spec):
+    if "xpath" in spec:
+        return etree.XPath(spec["xpath"])
+    return CSSSelector(spec["css"])
+
+
+class Field:
+    """One compiled field selector from a site schema"""
+
+    __slots__ = ("name", "select", "attr", "take", "default", "required", "all", "transform")
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.select = _compile_selector(spec)
+        self.attr = spec.get("attr")
+        self.take = spec.get("take", "text")
+        self.default = spec.get("default")
+        self.required = spec.get("required", False)
+        self.all = spec.get("all", False)
+        self.transform = TRANSFORMS[spec["transform"]] if "transform" in spec else None
+
+    def _value(self, element):
+        if self.attr:
+            value = element.get(self.attr)
+        elif self.take == "tail":
+            value = element.tail or ""
+        else:
+            value = element.text_content()
+        if value is None:
+            return None
+        value = value.strip()
+        return self.transform(value) if self.transform else value
+
+    def extract(self, node):
+        matches = self.select(node)
+        if self.all:
+            return [value for value in map(self._value, matches) if value is not None]
+        value = self._value(matches[0]) if matches else None
+        return self.default if value is None else value
+
+
+class Extractor:
+    """
+    Selector-driven extractor built from a site schema.
+
+    The page is parsed once with lxml; the container selector picks out
+    each product subtree and precompiled field selectors run against it.
+    Containers missing a required field are skipped.
+    """
+
+    def __init__(self, name, schema):
+        self.name = name
+        self.version = schema.get("version", 1)
+        container = schema["container"]
+        self.container = _compile_selector(container if isinstance(container, dict) else {"css": container})
+        self.fields = [Field(field_name, spec) for field_name, spec in schema["fields"].items()]
+        self.page_fields = [Field(field_name, spec) for field_name, spec in schema.get("page", {}).items()]
+
+    def parse(self, content):
+        if not content:
+            return None
+        if isinstance(content, bytes):
+            # lxml assumes latin-1 for bytes without a meta charset; most sites send UTF-8
+            try:
+                content = content.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+        try:
+            return html.document_fromstring(content)
+        except etree.ParserError:
+            return None
+
+    def records(self, document, limit=None):
+        records = []
+        for container in self.container(document):
+            record = {}
+            for field in self.fields:
+                value = field.extract(container)
+                if value is None and field.required:
+                    break
+                record[field.name] = value
+            else:
+                records.append(record)
+                if limit is not None and len(records) >= limit:
+                    break
+        return records
+
+    def page(self, document):
+        if document is None:
+            return {field.name: [] if field.all else field.default for field in self.page_fields}
+        return {field.name: field.extract(document) for field in self.page_fields}
+
+    def extract(self, content, limit=None, digest=None):
+        """
+        Return (records, page-level fields) for a raw HTML page.
+
+        With the body `digest` from the page cache, an unchanged page reuses
+        the extraction stored for it under this schema version. Cached
+        results are shared, so callers must not mutate them.
+        """
+        with stage("parse"):
+            return self._extract(content, limit, digest)
+
+    def cached(self, digest, limit=None):
+        """(records, page-level fields) stored for an unchanged page body, or None"""
+        page_cache = get_http_cache() if digest else None
+        cached = page_cache.get_parsed(digest, self.name, self.version) if page_cache is not None else None
+        if cached is None:
+            return None
+        records, page = cached
+        return records[:limit] if limit is not None else records, page
+
+    def remember(self, digest, records, page):
+        """Store a complete extraction for the page body `digest`"""
+        page_cache = get_http_cache() if digest else None
+        if page_cache is not None:
+            page_cache.store_parsed(digest, self.name, self.version, [records, page])
+
+    def extract_all(self, content):
+        document = self.parse(content)
+        return (self.records(document) if document is not None else []), self.page(document)
+
+    def _extract(self, content, limit, digest):
+        cached = self.cached(digest, limit)
+        if cached is not None:
+            return cached
+
+        if not digest or get_http_cache() is None:
+            document = self.parse(content)
+            records = self.records(document, limit) if document is not None else []
+            return records, self.page(document)
+
+        # Stored complete so any later limit can be served from it
+        records, page = self.extract_all(content)
+        self.remember(digest, records, page)
+        return records[:limit] if limit is not None else records, page
+
+
+_schemas = None
+_extractors = {}
+
+
+def load_schemas(path=SCHEMA_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_extractor(name):
+    """Compiled extractor for a site, built once per process"""
+    global _schemas
+    extractor = _extractors.get(name)
+    if extractor is None:
+        if _schemas is None:
+            _schemas = load_schemas()
+        extractor = _extractors[name] = Extractor(name, _schemas[name])
+    return extractor
@@ -1,9 +1,20 @@
-from datetime import datetime
-import requests
-import json
-from bs4 import BeautifulSoup
 import random
-import time
+from records import ProductRecord, ProductBatch
+from taxonomy import get_taxonomy
+from browser import get_browser_pool
+from httpcache import body_digest
+from google_specs import build_search_url, parse_results_page_async
+from logs import get_logger
+
+SOURCE = "Google Shopping"
+# Source label of the generated placeholder products, kept apart from real Google Shopping results
+GENERATED_SOURCE = "Google Shopping (generated)"
+# Circuit breaker key for rendered searches
+RENDER_SOURCE_NAME = "google_shopping_render"
+# Present once the shopping results grid has been built by the page's scripts
+RESULTS_SELECTOR = "div.sh-dgr__content"
+
+log = get_logger("google")
 
 def get_random_user_agent():
     user_agents = [
@@ -17,101 +28,79 @@ def scrape_product_details_google(item_name, seller=None, model=None):
     """
     Enhanced scraping function that ALWAYS returns data
     """
-    print(f"🔍 Scraping for: {item_name}, Seller: {seller}, Model: {model}")
+    log.debug(f"🔍 Scraping for: {item_name}, Seller: {seller}, Model: {model}")
     
     try:
         # Always return enhanced mock data since real scraping is unreliable
-        print("📝 Generating enhanced product data...")
+        log.debug("📝 Generating enhanced product data...")
         return generate_comprehensive_mock_data(item_name, seller, model)
         
     except Exception as e:
-        print(f"❌ Error in scraping: {e}")
+        log.error(f"❌ Error in scraping: {e}")
         # Ensure we always return data even if something fails
         return generate_basic_fallback_data(item_name, seller, model)
 
+async def scrape_product_details_google_rendered(item_name, seller=None, model=None):
+    """
+    Real Google Shopping results, rendered in a pooled headless page.
+
+    Returns None when the page rendered but held no products, so the
+    caller can fall back to generated data.
+    """
+    query = " ".join(filter(None, [item_name, seller, model]))
+    html = await get_browser_pool().render(
+        build_search_url(query, None), wait_for=RESULTS_SELECTOR, source=RENDER_SOURCE_NAME
+    )
+    # The rendered DOM keys the parsed-result cache like a fetched body would
+    return await parse_results_page_async(html, None, body_digest(html.encode()))
+
 def generate_comprehensive_mock_data(item_name, seller=None, model=None):
     """Generate comprehensive realistic product data"""
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
     # Normalize inputs
     base_name = item_name.title() if item_name else "Product"
     seller_name = seller.title() if seller else None
     model_name = model.upper() if model else None
     
-    print(f"📊 Generating data for: {base_name} | {seller_name} | {model_name}")
+    log.debug(f"📊 Generating data for: {base_name} | {seller_name} | {model_name}")
     
-    # Define realistic price ranges based on product type
-    price_ranges = {
-        "laptop": (35000, 85000),
-        "smartphone": (15000, 50000),
-        "mobile": (15000, 50000),
-        "phone": (15000, 50000),
-        "printer": (8000, 35000),
-        "tablet": (12000, 40000),
-        "camera": (25000, 75000),
-        "headphone": (2000, 15000),
-        "mouse": (500, 3000),
-        "keyboard": (1000, 8000),
-        "monitor": (12000, 45000),
-        "speaker": (3000, 25000),
-        "tv": (25000, 100000),
-        "refrigerator": (18000, 60000),
-        "washing": (20000, 45000),
-        "ac": (25000, 55000),
-        "microwave": (8000, 25000)
-    }
+    # Price range and typical brands from the longest taxonomy keyword in the item name
+    category = get_taxonomy().classify(item_name)
+    price_min, price_max = category.price_range
     
-    # Determine price range
-    price_min, price_max = (20000, 60000)  # default
-    item_lower = item_name.lower()
-    for product_type, (min_p, max_p) in price_ranges.items():
-        if product_type in item_lower:
-            price_min, price_max = min_p, max_p
-            break
-    
-    # Define realistic brands for different categories
-    brand_mapping = {
-        "laptop": ["HP", "Dell", "Lenovo", "Asus", "Acer", "Apple", "MSI"],
-        "smartphone": ["Samsung", "Apple", "OnePlus", "Xiaomi", "Oppo", "Vivo", "Realme"],
-        "mobile": ["Samsung", "Apple", "OnePlus", "Xiaomi", "Oppo", "Vivo", "Realme"],
-        "printer": ["HP", "Canon", "Epson", "Brother", "Samsung"],
-        "camera": ["Canon", "Nikon", "Sony", "Fujifilm", "Panasonic"],
-        "default": ["Samsung", "HP", "Dell", "Sony", "LG", "Asus", "Lenovo"]
-    }
-    
-    # Get relevant brands
-    relevant_brands = brand_mapping.get(item_lower.split()[0], brand_mapping["default"])
+    relevant_brands = list(category.brands)
     if seller_name and seller_name not in relevant_brands:
         relevant_brands.insert(0, seller_name)
     
-    products = []
+    products = ProductBatch()
     
     # Product 1: Exact match (if seller and model provided)
     if seller_name and model_name:
-        products.append({
-            "Product Name": f"{seller_name} {base_name} {model_name}",
-            "Seller": seller_name,
-            "Price": f"₹{random.randint(price_min, price_max):,}",
-            "Rating": f"{random.uniform(4.0, 4.8):.1f} stars",
-            "Reviews": f"{random.randint(75, 300)} reviews",
-            "Specifications": f"Latest {base_name} with {model_name} processor, Premium quality",
-            "Website": "TechMart India",
-            "Last Updated": current_time
-        })
+        products.append(ProductRecord(
+            name=f"{seller_name} {base_name} {model_name}",
+            seller=seller_name,
+            price_paise=random.randint(price_min, price_max) * 100,
+            rating=round(random.uniform(4.0, 4.8), 1),
+            review_count=random.randint(75, 300),
+            specifications=f"Latest {base_name} with {model_name} processor, Premium quality",
+            website="TechMart India",
+            source=GENERATED_SOURCE,
+            synthetic=True
+        ))
     
     # Product 2: Same brand, different model (if seller provided)
     if seller_name:
         alt_model = model_name + " Pro" if model_name else "Standard"
-        products.append({
-            "Product Name": f"{seller_name} {base_name} {alt_model}",
-            "Seller": seller_name,
-            "Price": f"₹{random.randint(int(price_max*0.8), int(price_max*1.1)):,}",
-            "Rating": f"{random.uniform(4.1, 4.7):.1f} stars",
-            "Reviews": f"{random.randint(50, 250)} reviews",
-            "Specifications": f"Enhanced {base_name} with {alt_model} features, Extended warranty",
-            "Website": "ElectroWorld",
-            "Last Updated": current_time
-        })
+        products.append(ProductRecord(
+            name=f"{seller_name} {base_name} {alt_model}",
+            seller=seller_name,
+            price_paise=random.randint(int(price_max*0.8), int(price_max*1.1)) * 100,
+            rating=round(random.uniform(4.1, 4.7), 1),
+            review_count=random.randint(50, 250),
+            specifications=f"Enhanced {base_name} with {alt_model} features, Extended warranty",
+            website="ElectroWorld",
+            source=GENERATED_SOURCE,
+            synthetic=True
+        ))
     
     # Product 3-5: Alternative brands
     for i, brand in enumerate(relevant_brands[:3]):
@@ -121,73 +110,76 @@ def generate_comprehensive_mock_data(item_name, seller=None, model=None):
         variant_models = ["Standard", "Pro", "Plus", "Max", "Elite"]
         variant_model = model_name if model_name else random.choice(variant_models)
         
-        products.append({
-            "Product Name": f"{brand} {base_name} {variant_model}",
-            "Seller": brand,
-            "Price": f"₹{random.randint(price_min, price_max):,}",
-            "Rating": f"{random.uniform(3.8, 4.6):.1f} stars",
-            "Reviews": f"{random.randint(30, 200)} reviews",
-            "Specifications": f"Quality {base_name} with {variant_model} technology, Good performance",
-            "Website": f"{brand.lower()}store.com",
-            "Last Updated": current_time
-        })
+        products.append(ProductRecord(
+            name=f"{brand} {base_name} {variant_model}",
+            seller=brand,
+            price_paise=random.randint(price_min, price_max) * 100,
+            rating=round(random.uniform(3.8, 4.6), 1),
+            review_count=random.randint(30, 200),
+            specifications=f"Quality {base_name} with {variant_model} technology, Good performance",
+            website=f"{brand.lower()}store.com",
+            source=GENERATED_SOURCE,
+            synthetic=True
+        ))
     
     # Product 6: Budget option
     budget_brand = "ValueTech" if not seller_name else f"{seller_name} Budget"
-    products.append({
-        "Product Name": f"{budget_brand} {base_name} Basic",
-        "Seller": "ValueTech",
-        "Price": f"₹{random.randint(int(price_min*0.6), int(price_min*0.8)):,}",
-        "Rating": f"{random.uniform(3.5, 4.2):.1f} stars",
-        "Reviews": f"{random.randint(100, 180)} reviews",
-        "Specifications": f"Affordable {base_name} with essential features, Budget-friendly",
-        "Website": "BudgetElectronics.in",
-        "Last Updated": current_time
-    })
+    products.append(ProductRecord(
+        name=f"{budget_brand} {base_name} Basic",
+        seller="ValueTech",
+        price_paise=random.randint(int(price_min*0.6), int(price_min*0.8)) * 100,
+        rating=round(random.uniform(3.5, 4.2), 1),
+        review_count=random.randint(100, 180),
+        specifications=f"Affordable {base_name} with essential features, Budget-friendly",
+        website="BudgetElectronics.in",
+        source=GENERATED_SOURCE,
+        synthetic=True
+    ))
     
     # Product 7: Premium option
     premium_brand = seller_name + " Premium" if seller_name else "PremiumTech"
-    products.append({
-        "Product Name": f"{premium_brand} {base_name} Ultimate",
-        "Seller": "PremiumTech",
-        "Price": f"₹{random.randint(int(price_max*1.1), int(price_max*1.4)):,}",
-        "Rating": f"{random.uniform(4.4, 4.9):.1f} stars",
-        "Reviews": f"{random.randint(25, 120)} reviews",
-        "Specifications": f"Top-tier {base_name} with ultimate features, Premium build quality",
-        "Website": "PremiumElectronics.com",
-        "Last Updated": current_time
-    })
+    products.append(ProductRecord(
+        name=f"{premium_brand} {base_name} Ultimate",
+        seller="PremiumTech",
+        price_paise=random.randint(int(price_max*1.1), int(price_max*1.4)) * 100,
+        rating=round(random.uniform(4.4, 4.9), 1),
+        review_count=random.randint(25, 120),
+        specifications=f"Top-tier {base_name} with ultimate features, Premium build quality",
+        website="PremiumElectronics.com",
+        source=GENERATED_SOURCE,
+        synthetic=True
+    ))
     
     # Product 8: Government supplier
-    products.append({
-        "Product Name": f"Government Grade {base_name} {model_name or 'Standard'}",
-        "Seller": "GovSupplies Ltd",
-        "Price": f"₹{random.randint(int(price_min*0.9), price_max):,}",
-        "Rating": "4.3 stars",
-        "Reviews": "Government certified",
-        "Specifications": f"Government-approved {base_name}, Bulk pricing available, Tender-ready",
-        "Website": "https://govsupplies.gov.in",
-        "Last Updated": current_time
-    })
-    
-    print(f"✅ Generated {len(products)} products successfully")
-    return json.dumps(products, indent=4, ensure_ascii=False)
+    products.append(ProductRecord(
+        name=f"Government Grade {base_name} {model_name or 'Standard'}",
+        seller="GovSupplies Ltd",
+        price_paise=random.randint(int(price_min*0.9), price_max) * 100,
+        rating=4.3,
+        reviews_text="Government certified",
+        specifications=f"Government-approved {base_name}, Bulk pricing available, Tender-ready",
+        website="https://govsupplies.gov.in",
+        source=GENERATED_SOURCE,
+        synthetic=True
+    ))
+    
+    log.debug(f"✅ Generated {len(products)} products successfully")
+    return products
 
 def generate_basic_fallback_data(item_name, seller, model):
     """Basic fallback if everything fails"""
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    products = [
-        {
-            "Product Name": f"{seller or 'Brand'} {item_name} {model or 'Model'}",
-            "Seller": seller or "TechStore",
-            "Price": "₹45,000",
-            "Rating": "4.2 stars",
-            "Reviews": "100 reviews",
-            "Specifications": f"Quality {item_name} with standard features",
-            "Website": "techstore.com",
-            "Last Updated": current_time
-        }
-    ]
-    
-    return json.dumps(products, indent=4, ensure_ascii=False)
\ No newline at end of file
+    products = ProductBatch([
+        ProductRecord(
+            name=f"{seller or 'Brand'} {item_name} {model or 'Model'}",
+            seller=seller or "TechStore",
+            price_paise=45000 * 100,
+            rating=4.2,
+            review_count=100,
+            specifications=f"Quality {item_name} with standard features",
+            website="techstore.com",
+            source=GENERATED_SOURCE,
+            synthetic=True
+        )
+    ])
+    
+    return products
\ No newline at end of file
@@ -1,8 +1,21 @@
-from datetime import datetime
-import requests
-import json
-from bs4 import BeautifulSoup
+import os
 import random
+from engine import get_engine, get_sync_fetcher
+from httpcache import response_digest
+from extract import get_extractor
+from parse_pool import get_parse_pool
+from collector import ResultCollector
+from records import ProductRecord, ProductBatch
+from specindex import spec_terms, matches_specs
+from logs import get_logger
+
+SOURCE = "Google Shopping"
+# Search endpoint; pointed at a local fixture server for benchmarks
+GOOGLE_SHOPPING_URL = os.environ.get("GOOGLE_SHOPPING_URL", "https://www.google.co.uk/search")
+# Circuit breaker key in the fetch scheduler
+SOURCE_NAME = "google_specs"
+
+log = get_logger("google_specs")
 
 def get_random_user_agent():
     user_agents = [
@@ -19,12 +32,7 @@ def get_random_user_agent():
 
 
 
-def scrape_product_details_google_specs(item_name ,specifications):
-
-    headers = {
-        "User-Agent": get_random_user_agent(),
-    }
-
+def build_search_url(item_name, specifications):
     search_query = item_name.replace(' ', '+')
     if specifications:
         for spec in specifications:
@@ -33,94 +41,79 @@ def scrape_product_details_google_specs(item_name ,specifications):
             search_query += f"+{spec_name.replace(' ', '+')}"
             search_query += f"+{spec_value.replace(' ', '+')}"
 
-    response = requests.get(f"https://www.google.co.uk/search?q={search_query}&tbm=shop", headers=headers)
+    return f"{GOOGLE_SHOPPING_URL}?q={search_query}&tbm=shop"
 
 
-    if response.status_code != 200:
-        print(f"Failed to retrieve page with status code: {response.status_code}")
+def parse_results_page(content, specifications, digest=None):
+    products, _ = get_extractor("google_shopping").extract(content, digest=digest)
+    return results_batch(products, specifications)
+
+
+async def parse_results_page_async(content, specifications, digest=None):
+    """parse_results_page with large pages parsed in the parse pool"""
+    products, _ = await get_parse_pool().extract("google_shopping", content, digest=digest)
+    return results_batch(products, specifications)
+
+
+def results_batch(products, specifications):
+    if not products:
+        log.warning("No product containers found. The HTML structure may have changed.")
         return None
 
-   
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    
-    product_containers = soup.find_all('div', class_='sh-dgr__content')
-    if not product_containers:
-        print("No product containers found. The HTML structure may have changed.")
+    # Normalized once per page: "16 GB" in the request matches "16GB" on the page
+    required = spec_terms(specifications)
+    collector = ResultCollector(limit=10)
+
+    for product in products:
+        if collector.full:
+            break
+
+        record = ProductRecord.from_display(
+            product["Product Name"],
+            product["Seller"],
+            product["Price"],
+            rating=product["Rating"],
+            reviews=product["Reviews"],
+            specifications=product["Specifications"],
+            website=product["Website"],
+            source=SOURCE
+        )
+        if matches_specs(record, required):
+            collector.add(record)
+
+
+    return ProductBatch(collector.results())
+
+
+def scrape_product_details_google_specs(item_name ,specifications):
+
+    headers = {
+        "User-Agent": get_random_user_agent(),
+    }
+
+    response = get_sync_fetcher().fetch(build_search_url(item_name, specifications), headers=headers, source=SOURCE_NAME)
+
+
+    if response.status_code != 200:
+        log.warning(f"Failed to retrieve page with status code: {response.status_code}")
         return None
 
+    return parse_results_page(response.content, specifications, response_digest(response))
 
-    result_list = []
 
-    for container in product_containers:
-        if len(result_list) >= 10:  
-            break
+async def scrape_product_details_google_specs_async(item_name, specifications):
+    """Async variant of scrape_product_details_google_specs using the shared engine"""
+    headers = {
+        "User-Agent": get_random_user_agent(),
+    }
+
+    response = await get_engine().fetch(build_search_url(item_name, specifications), headers=headers, source=SOURCE_NAME)
+
+    if response.status_code != 200:
+        log.warning(f"Failed to retrieve page with status code: {response.status_code}")
+        return None
 
-        try:
-            # Extract product name
-            product_name = container.find('h3', class_='tAxDx')
-            if product_name:
-                product_name = product_name.text.strip()
-            else:
-                continue
-
-            # Extract manufacturer or seller
-            manufacturer = container.find('div', class_='aULzUe')
-            if manufacturer:
-                manufacturer = manufacturer.text.strip()
-            else:
-                continue
-
-            # Extract product price
-            price = container.find('span', class_='a8Pemb OFFNJ')
-            if price:
-                price = price.text.strip()
-            else:
-                continue
-            rating = container.find('span', class_='Rsc7Yb').text if container.find('span', class_='Rsc7Yb') else 'No rating'
-            
-            div_rev = container.find('div', class_='qSSQfd uqAnbd') 
-            if div_rev:
-                text = div_rev.find_next_sibling(string=True)
-                reviews = text.strip()
-            else:
-                reviews = "No Reviews"
-            specifi = container.find('div', class_='F7Kwhf').text if container.find('div', class_='F7Kwhf') else 'No specifications'
-                    
-            link_tag = container.find('a', class_='shntl')
-            href = link_tag['href'] if link_tag else None
-
-            # Extract the website name from the href
-            website = href.split("url=")[-1].split("%")[0] if href else None
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-
-            if specifications:
-                specs_match = all(
-                    spec["value"].lower() in product_name.lower() or spec["value"].lower() in specifi.lower()
-                    for spec in specifications
-                )
-            else:
-                specs_match = True  # No specifications to match
-
-            if specs_match:
-                result_list.append({
-                    "Product Name": product_name,
-                    "Seller": manufacturer,
-                    "Price": price,
-                    "Rating": rating,
-                    "Reviews": reviews,
-                    "Specifications": specifi,
-                    "Website": website,
-                    "last_updated": current_time
-                })
-
-        except Exception as e:
-            print(e)
-            continue
-
-
-    return json.dumps(result_list, indent=4,ensure_ascii=False)
+    return await parse_results_page_async(response.content, specifications, response_digest(response))
 
 
 # Example usage
@@ -0,0 +1,191 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from collector import normalize_identity
+from logs import get_logger
+
+# SQLite file holding every price observation; empty disables recording
+HISTORY_DB = os.environ.get("PRICE_HISTORY_DB", "price_history.db")
+# Observations written per transaction, and the longest a queued one waits
+WRITE_BATCH = 1000
+FLUSH_INTERVAL = 1.0
+# Observations buffered before new ones are dropped rather than slowing requests
+MAX_PENDING = 100_000
+DEFAULT_DAYS = 30
+# Rows recorded before the synthetic flag that are certainly generated: the Google Shopping
+# placeholders used these fixed sellers. The other placeholder rows of that era share the source
+# label of real Google Shopping results and cannot be told apart, so they stay unflagged.
+LEGACY_GENERATED = (
+    "source = ? AND seller IN (?, ?, ?)",
+    ("Google Shopping", "valuetech", "premiumtech", "govsupplies ltd"),
+)
+
+log = get_logger("history")
+
+
+class PriceHistory:
+    """
+    Append-only store of scraped prices, indexed by (item, seller, source, time).
+
+    Only real observations are kept: records flagged `synthetic` are
+    skipped. `record` only enqueues, so the request path never touches the disk; a
+    writer thread drains the queue and inserts whole batches in a single
+    transaction. WAL mode lets queries run while the writer appends.
+    """
+
+    def __init__(self, path, write_batch=WRITE_BATCH, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.path = path
+        self.write_batch = write_batch
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS price_observations ("
+            "item TEXT NOT NULL, seller TEXT NOT NULL, source TEXT NOT NULL, observed_at REAL NOT NULL, "
+            "price_paise INTEGER NOT NULL, currency TEXT NOT NULL, product TEXT, "
+            "synthetic INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._migrate()
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS price_observations_lookup "
+            "ON price_observations (item, seller, source, observed_at)"
+        )
+        self._conn.commit()
+        self.counters = {"recorded": 0, "written": 0, "dropped": 0, "synthetic": 0, "write_failures": 0}
+        self._writer = threading.Thread(target=self._write_loop, name="price-history-writer", daemon=True)
+        self._stopping = threading.Event()
+        self._writer.start()
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(price_observations)")}
+        if "synthetic" in columns:
+            return
+        # Generated rows were recorded unflagged; flag those that are recognizably generated
+        self._conn.execute("ALTER TABLE price_observations ADD COLUMN synthetic INTEGER NOT NULL DEFAULT 0")
+        clause, params = LEGACY_GENERATED
+        flagged = self._conn.execute(f"UPDATE price_observations SET synthetic = 1 WHERE {clause}", params).rowcount
+        log.info(f"✅ Flagged {flagged} legacy generated price observations")
+
+    def record(self, item_name, batch, source=None):
+        """Queue one observation per priced, non-synthetic record of a ProductBatch"""
+        item = normalize_identity(item_name)
+        for record in batch:
+            if record.synthetic:
+                self.counters["synthetic"] += 1
+                continue
+            if record.price_paise is None:
+                continue
+            row = (
+                item,
+                normalize_identity(record.seller),
+                record.source or source or "",
+                batch.scraped_at,
+                record.price_paise,
+                record.currency,
+                record.name,
+            )
+            try:
+                self._queue.put_nowait(row)
+                self.counters["recorded"] += 1
+            except queue.Full:
+                self.counters["dropped"] += 1
+
+    def _drain(self, first):
+        rows = [first]
+        while len(rows) < self.write_batch:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write_loop(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            rows = self._drain(first)
+            try:
+                with self._lock:
+                    self._conn.executemany(
+                        "INSERT INTO price_observations "
+                        "(item, seller, source, observed_at, price_paise, currency, product) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    self._conn.commit()
+                self.counters["written"] += len(rows)
+            except sqlite3.Error as e:
+                self.counters["write_failures"] += len(rows)
+                log.error(f"❌ Price history write failed: {e}")
+
+    def daily(self, item_name, seller=None, source=None, days=DEFAULT_DAYS):
+        """Daily min/median/max price of an item over the last `days` days, oldest first"""
+        clauses = ["item = ?", "observed_at >= ?", "synthetic = 0"]
+        params = [normalize_identity(item_name), time.time() - days * 86400]
+        if seller:
+            clauses.append("seller = ?")
+            params.append(normalize_identity(seller))
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date(observed_at, 'unixepoch', 'localtime'), price_paise FROM price_observations "
+                f"WHERE {' AND '.join(clauses)} ORDER BY observed_at",
+                params,
+            ).fetchall()
+
+        by_day = {}
+        for day, price_paise in rows:
+            by_day.setdefault(day, []).append(price_paise)
+
+        points = []
+        for day, prices in by_day.items():
+            prices = np.asarray(prices, dtype=float) / 100
+            points.append({
+                "date": day,
+                "observations": int(prices.size),
+                "min_price": round(float(prices.min()), 2),
+                "median_price": round(float(np.median(prices)), 2),
+                "max_price": round(float(prices.max()), 2),
+            })
+        return points
+
+    def stats(self):
+        return {**self.counters, "pending": self._queue.qsize(), "path": self.path}
+
+    def close(self):
+        """Flush everything queued, then close the database"""
+        self._stopping.set()
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+
+_history = None
+
+
+def get_history():
+    """Process-wide price history store, or None when disabled"""
+    global _history
+    if _history is None and HISTORY_DB:
+        _history = PriceHistory(HISTORY_DB)
+    return _history
+
+
+def close_history():
+    global _history
+    if _history is not None:
+        _history.close()
+        _history = None
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+# SQLite file holding compressed page bodies and their parsed extractions; empty disables
+HTTP_CACHE_DB = os.environ.get("SCRAPER_HTTP_CACHE", "http_cache.db")
+# Pages not revalidated for this long are purged
+MAX_AGE = 7 * 24 * 60 * 60
+# Stored pages and extractions kept at most; the least recently stored go first
+MAX_PAGES = int(os.environ.get("SCRAPER_HTTP_CACHE_PAGES", 5000))
+MAX_PARSED = int(os.environ.get("SCRAPER_HTTP_CACHE_PARSED", 20000))
+# Writes between two purges of the file
+PRUNE_EVERY = 200
+# Parsed extractions also kept in memory, most recently used first
+PARSED_MEMORY_ENTRIES = 512
+COMPRESSION_LEVEL = 6
+
+# Headers the fetch layer adds to responses that went through the cache
+DIGEST_HEADER = "x-scrape-digest"
+STATUS_HEADER = "x-scrape-cache"
+
+
+def body_digest(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def response_digest(response):
+    """Digest of a fetched body, present when the response passed through the page cache"""
+    return response.headers.get(DIGEST_HEADER)
+
+
+class HttpCache:
+    """
+    Conditional-fetch page cache.
+
+    Stores each 200 body zlib-compressed with its ETag / Last-Modified so
+    the next fetch of the URL can be conditional; a 304 is answered from
+    the stored body. Extraction results are stored by (body digest,
+    schema, schema version), so an unchanged page - revalidated or simply
+    re-sent identical - is never parsed twice. Every `PRUNE_EVERY` writes
+    (and on close) rows older than `max_age` are deleted and each table is
+    cut back to its newest `max_pages` / `max_parsed` rows.
+    """
+
+    def __init__(self, path, max_age=MAX_AGE, memory_entries=PARSED_MEMORY_ENTRIES,
+                 max_pages=MAX_PAGES, max_parsed=MAX_PARSED):
+        self.path = path
+        self.max_age = max_age
+        self.memory_entries = memory_entries
+        self.max_pages = max_pages
+        self.max_parsed = max_parsed
+        self._writes = 0
+        self._parsed = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, digest TEXT NOT NULL, "
+            "body BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            "digest TEXT NOT NULL, schema TEXT NOT NULL, version INTEGER NOT NULL, value BLOB NOT NULL, "
+            "stored_at REAL NOT NULL, PRIMARY KEY (digest, schema, version))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_stored_at ON pages (stored_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS parsed_stored_at ON parsed (stored_at)")
+        self._conn.commit()
+        self.counters = {
+            "revalidated": 0,
+            "stored": 0,
+            "bytes_saved": 0,
+            "parse_hits": 0,
+            "parse_misses": 0,
+            "pruned": 0,
+        }
+
+    def validators(self, url):
+        """(conditional request headers, entry) for a URL, or ({}, None) if it was never stored"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, digest FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return {}, None
+        etag, last_modified, digest = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers, digest
+
+    def revalidated(self, url, entry):
+        """
+        Body and digest of a stored page after the server answered 304.
+
+        None if that copy was pruned or replaced while the request was out.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM pages WHERE url = ? AND digest = ?", (url, entry)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET stored_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        body = zlib.decompress(row[0])
+        self.counters["revalidated"] += 1
+        self.counters["bytes_saved"] += len(body)
+        return body, entry
+
+    def store(self, url, headers, body):
+        """Keep a 200 body with its validators; returns its digest"""
+        digest = body_digest(body)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, digest, body, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, headers.get("ETag"), headers.get("Last-Modified"), digest,
+                 zlib.compress(body, COMPRESSION_LEVEL), time.time()),
+            )
+            self._conn.commit()
+            self._wrote()
+        self.counters["stored"] += 1
+        return digest
+
+    def get_parsed(self, digest, schema, version):
+        key = (digest, schema, version)
+        with self._lock:
+            value = self._parsed.get(key)
+            if value is not None:
+                self._parsed.move_to_end(key)
+            else:
+                row = self._conn.execute(
+                    "SELECT value FROM parsed WHERE digest = ? AND schema = ? AND version = ?", key
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(zlib.decompress(row[0]))
+                    self._remember(key, value)
+        self.counters["parse_hits" if value is not None else "parse_misses"] += 1
+        return value
+
+    def store_parsed(self, digest, schema, version, value):
+        payload = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(), COMPRESSION_LEVEL)
+        with self._lock:
+            self._remember((digest, schema, version), value)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed (digest, schema, version, value, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (digest, schema, version, payload, time.time()),
+            )
+            self._conn.commit()
+            self._wrote()
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes >= PRUNE_EVERY:
+            self._writes = 0
+            self._prune()
+
+    def _prune(self):
+        """Delete expired rows and the oldest beyond each table's cap; the caller holds the lock"""
+        cutoff = time.time() - self.max_age
+        deleted = 0
+        for table, cap in (("pages", self.max_pages), ("parsed", self.max_parsed)):
+            deleted += self._conn.execute(f"DELETE FROM {table} WHERE stored_at < ?", (cutoff,)).rowcount
+            deleted += self._conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (cap,)
+            ).rowcount
+        self._conn.commit()
+        self.counters["pruned"] += deleted
+
+    def _remember(self, key, value):
+        self._parsed[key] = value
+        self._parsed.move_to_end(key)
+        while len(self._parsed) > self.memory_entries:
+            self._parsed.popitem(last=False)
+
+    def stats(self):
+        return {
+            **self.counters,
+            "memory_entries": len(self._parsed),
+            "max_pages": self.max_pages,
+            "max_parsed": self.max_parsed,
+            "path": self.path,
+        }
+
+    def close(self):
+        with self._lock:
+            self._prune()
+            self._conn.close()
+
+
+_http_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Process-wide page cache, or None when disabled"""
+    global _http_cache
+    with _cache_lock:
+        if _http_cache is None and HTTP_CACHE_DB:
+            _http_cache = HttpCache(HTTP_CACHE_DB)
+        return _http_cache
+
+
+def close_http_cache():
+    global _http_cache
+    with _cache_lock:
+        if _http_cache is not None:
+            _http_cache.close()
+            _http_cache = None
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import re
+from datetime import datetime
+from urllib.parse import quote, urljoin
+
+from collector import normalize_identity
+from engine import get_engine
+from extract import get_extractor
+from httpcache import response_digest
+from logs import get_logger
+from parse_pool import get_parse_pool
+from taxonomy import KeywordMatcher, words
+
+SOURCE = "JustDial"
+# Cache key kind for service-provider searches
+SERVICES = "services"
+# Circuit breaker key in the fetch scheduler
+SOURCE_NAME = "justdial"
+# Listing site root; pointed at a local fixture server for benchmarks
+JUSTDIAL_URL = os.environ.get("JUSTDIAL_URL", "https://www.justdial.com").rstrip("/")
+# Result pages fetched together per search
+JUSTDIAL_PAGES = int(os.environ.get("JUSTDIAL_PAGES", 3))
+# Seconds a request waits for one description's listing before answering without it
+JUSTDIAL_DEADLINE = float(os.environ.get("JUSTDIAL_DEADLINE", 6.0))
+# City -> aliases, localities and PIN prefixes used to bucket free-text locations
+LOCATIONS_PATH = os.environ.get(
+    "SCRAPER_LOCATIONS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "locations.json")
+)
+# Listing category searched when a request names no service
+SERVICE_CATEGORIES = {
+    "medical": "Hospitals",
+    "electrical": "Electricians",
+    "civil": "Civil Contractors",
+}
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+_PIN = re.compile(r"\b(\d{6})\b")
+
+log = get_logger("justdial")
+
+
+class LocationBucket:
+    """A free-text location resolved to the city whose listings answer it"""
+
+    __slots__ = ("city", "locality", "key")
+
+    def __init__(self, city, locality=None):
+        self.city = city
+        self.locality = locality
+        self.key = city.lower()
+
+
+class Geocoder:
+    """
+    Buckets locations by city so neighbouring queries share one search.
+
+    "Andheri East", "Powai, Mumbai" and "400076" all land in Mumbai: a PIN
+    code is matched on its longest known prefix, then city names and
+    aliases, then known localities. Anything else becomes its own bucket
+    from the last comma-separated part that is not a state or PIN code.
+    """
+
+    def __init__(self, data):
+        cities = data["cities"]
+        self.states = frozenset(data.get("states", []))
+        self.pin_prefixes = {prefix: city for city, entry in cities.items() for prefix in entry.get("pin_prefixes", [])}
+        self.aliases = KeywordMatcher({alias: city for city, entry in cities.items() for alias in entry.get("aliases", [])})
+        self.localities = KeywordMatcher(
+            {locality: city for city, entry in cities.items() for locality in entry.get("localities", [])}
+        )
+
+    def bucket(self, location):
+        text = str(location or "").strip()
+        pin = _PIN.search(text)
+        if pin:
+            code = pin.group(1)
+            for length in range(len(code), 2, -1):
+                city = self.pin_prefixes.get(code[:length])
+                if city:
+                    return LocationBucket(city, self._locality(text))
+        match = self.aliases.longest(text)
+        if match:
+            return LocationBucket(match[1], self._locality(text))
+        match = self.localities.longest(text)
+        if match:
+            return LocationBucket(match[1], match[0])
+        parts = [
+            part_words for part_words in ([word for word in words(part) if not word.isdigit()] for part in text.split(","))
+            if part_words and " ".join(part_words) not in self.states
+        ]
+        return LocationBucket("-".join(word.capitalize() for word in parts[-1]) if parts else "India")
+
+    def _locality(self, text):
+        match = self.localities.longest(text)
+        return match[0] if match else None
+
+
+_geocoder = None
+
+
+def get_geocoder():
+    global _geocoder
+    if _geocoder is None:
+        with open(LOCATIONS_PATH, encoding="utf-8") as f:
+            _geocoder = Geocoder(json.load(f))
+    return _geocoder
+
+
+def location_bucket(location):
+    return get_geocoder().bucket(location)
+
+
+def search_description(service_type, description):
+    """The listing category to search: the request's description, else the service type's default"""
+    description = " ".join(str(description or "").split())
+    return description or SERVICE_CATEGORIES.get(service_type, service_type.capitalize())
+
+
+def build_page_url(city, description, page=1):
+    path = f"{JUSTDIAL_URL}/{quote(city)}/{quote(description.replace(' ', '-'))}"
+    return f"{path}/page-{page}" if page > 1 else f"{path}/"
+
+
+def parse_listing(content, digest=None):
+    """Provider dicts, shaped like the Express scraper's output, from one listing page"""
+    providers, _ = get_extractor("justdial").extract(content, digest=digest)
+    return listing_providers(providers)
+
+
+def listing_providers(providers):
+    scraped_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return [
+        {
+            **provider,
+            # Cached extractions are shared, so the list is joined into a new dict
+            "specialization": ", ".join(provider["specialization"]),
+            "website": urljoin(JUSTDIAL_URL + "/", provider["website"]) if provider["website"] else JUSTDIAL_URL,
+            "source": SOURCE,
+            "last_updated": scraped_at,
+        }
+        for provider in providers
+    ]
+
+
+async def fetch_page(city, description, page):
+    response = await get_engine().fetch(build_page_url(city, description, page), headers=HEADERS, source=SOURCE_NAME)
+    if response.status_code != 200:
+        # Past the last page JustDial answers 404
+        return []
+    providers, _ = await get_parse_pool().extract("justdial", response.content, digest=response_digest(response))
+    return listing_providers(providers)
+
+
+async def scrape_service_providers_justdial(city, description, pages=JUSTDIAL_PAGES):
+    """
+    Providers for a description in a city, from up to `pages` result pages.
+
+    Pages are fetched concurrently and merged in page order; a provider
+    listed on several pages (same name and phone) is kept once.
+    """
+    results = await asyncio.gather(
+        *(fetch_page(city, description, page) for page in range(1, pages + 1)), return_exceptions=True
+    )
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures and len(failures) == len(results):
+        raise failures[0]
+    for failure in failures:
+        log.warning(f"⚠️ JustDial page failed: {failure}")
+
+    providers = {}
+    for page in results:
+        if isinstance(page, Exception):
+            continue
+        for provider in page:
+            key = (normalize_identity(provider["service_provider"]), normalize_identity(provider["phone"]))
+            providers.setdefault(key, provider)
+    return list(providers.values())
+
+
+def rank_by_locality(providers, locality):
+    """Providers in the requested locality first, otherwise in listing order"""
+    if not locality:
+        return providers
+    locality = normalize_identity(locality)
+    return sorted(providers, key=lambda provider: locality not in normalize_identity(provider["location"]))
@@ -0,0 +1,141 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Records below this level are dropped before any formatting work
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "text" for readable lines, "json" for one object per line
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+ROOT = "scraper"
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_STANDARD = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+def fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _STANDARD}
+
+
+class TextFormatter(logging.Formatter):
+    """`time level logger message key=value ...`"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        extra = fields(record)
+        if extra:
+            line += " " + " ".join(f"{key}={value}" for key, value in extra.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **fields(record),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread with only the message resolved.
+
+    With no listener running (before `start_logging`, after `stop_logging`,
+    in scripts and parser processes) records are written by the caller.
+    """
+
+    def __init__(self, records, target):
+        super().__init__(records)
+        self.target = target
+
+    def prepare(self, record):
+        # Formatting and the stdout write happen on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        if _listener is None:
+            self.target.handle(record)
+        else:
+            super().emit(record)
+
+
+_listener = None
+_lock = threading.Lock()
+_output = logging.StreamHandler(sys.stdout)
+_handler = _DeferredQueueHandler(queue.SimpleQueue(), _output)
+
+
+def _configure(level, log_format, stream):
+    _output.setStream(stream or sys.stdout)
+    _output.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+    root = logging.getLogger(ROOT)
+    root.handlers[:] = [_handler]
+    root.setLevel(level)
+    root.propagate = False
+
+
+def start_logging(level=LOG_LEVEL, log_format=LOG_FORMAT, stream=None):
+    """
+    Move log output for every `scraper.*` logger onto one listener thread.
+
+    Called by the server entry points; afterwards callers only pay for a
+    level check and a queue put, so a slow or blocked stdout never stalls
+    the event loop.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        _configure(level, log_format, stream)
+        _listener = QueueListener(_handler.queue, _output)
+        _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread; later records are written directly"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        listener, _listener = _listener, None
+        listener.stop()
+        # Records queued after the listener's stop marker would otherwise never be written
+        while True:
+            try:
+                record = _handler.queue.get_nowait()
+            except queue.Empty:
+                break
+            _output.handle(record)
+
+
+def _reset_in_child():
+    """A forked worker inherits the queue handler but not the listener thread"""
+    global _listener, _lock
+    _listener = None
+    _lock = threading.Lock()
+    # Records still queued belong to the parent, which writes them
+    _handler.queue = queue.SimpleQueue()
+
+
+_configure(LOG_LEVEL, LOG_FORMAT, None)
+os.register_at_fork(after_in_child=_reset_in_child)
+atexit.register(stop_logging)
+
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT}.{name}")
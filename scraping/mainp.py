@@ -1,6 +1,9 @@
+import asyncio
 import time
-from test import scrape_product_details_builder_mart
-from google import scrape_product_details_google
+from aggregator import aggregate
+from engine import close_engine
+from history import close_history
+from sources import SearchQuery, MAKE_MODEL
 import json
 
 # Prompt the user for input
@@ -10,26 +13,25 @@ print("Enter manufacturer (optional):")
 seller = input().strip() or None
 print("Enter model (optional):")
 model = input().strip() or None
+print("Enter category (electronics/medical/construction, default construction):")
+category = input().strip() or "construction"
 
-# Scrape the product details from both sources
-# result_json1 = scrape_product_details_builder_mart(item_name, seller, model)
-start_time = time.perf_counter()
-result_json2 = scrape_product_details_google(item_name, seller, model)
 
-# Convert the JSON strings to Python lists
-# result_list1 = json.loads(result_json1) if result_json1 else []
-# result_list2 = json.loads(result_json2) if result_json2 else []
+async def main():
+    try:
+        # Scrape the product details from every registered source at once
+        return await aggregate(SearchQuery(category, item_name, seller, model), MAKE_MODEL)
+    finally:
+        await close_engine()
+        close_history()
 
-# Combine the two lists
-# combined_results = result_list1 + result_list2
 
-# # Convert the combined list back to a JSON string
-# combined_json = json.dumps(combined_results, indent=4, ensure_ascii=False)
+start_time = time.perf_counter()
+combined_results, source_status = asyncio.run(main())
 
 # Print the combined results
-# print(combined_json)
-
-print(result_json2)
+print(json.dumps(combined_results.to_dicts(), indent=4, ensure_ascii=False))
+print(json.dumps(source_status, indent=4, ensure_ascii=False))
 end_time = time.perf_counter()
 processing_time = end_time - start_time
-print(f"Processing Time: {processing_time:.2f} seconds")
\ No newline at end of file
+print(f"Processing Time: {processing_time:.2f} seconds")
@@ -0,0 +1,199 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from extract import get_extractor, load_schemas
+from httpcache import get_http_cache
+from logs import get_logger
+from metrics import stage
+
+# Server processes sharing this machine; serve.py sets it to its gunicorn worker count
+SERVER_WORKERS = max(1, int(os.environ.get("SCRAPE_SERVER_WORKERS", 1)))
+
+
+def default_parse_workers(cpus=None, server_workers=SERVER_WORKERS):
+    """
+    Parsers per server process that fit beside the event loops: this process's
+    share of the cores minus the one its loop runs on, at most 2. Zero once
+    the server processes alone fill the machine, since parsers would then
+    only contend with the loops for the same cores.
+    """
+    share = (cpus or os.cpu_count() or 1) // server_workers
+    return max(0, min(2, share - 1))
+
+
+# Parser processes per server process; 0 parses every page on the event loop
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", default_parse_workers()))
+# Pages below this size parse inline: lxml takes ~2 ms on 16 KiB, about what the process hop costs
+PARSE_INLINE_BYTES = int(os.environ.get("PARSE_INLINE_BYTES", 16 * 1024))
+# Pages queued or parsing at once; further callers wait for a slot instead of piling onto the pool
+PARSE_QUEUE = int(os.environ.get("PARSE_QUEUE", 4 * max(PARSE_WORKERS, 1)))
+
+log = get_logger("parse_pool")
+
+
+@contextmanager
+def _main_module_hidden():
+    """
+    Start processes without the launching script: a multiprocessing child
+    otherwise re-imports `__main__` (server.py and all it imports) as
+    `__mp_main__`, and nothing a parser runs lives there.
+    """
+    main = sys.modules["__main__"]
+    saved = {name: vars(main)[name] for name in ("__spec__", "__file__") if name in vars(main)}
+    main.__spec__ = None
+    vars(main).pop("__file__", None)
+    try:
+        yield
+    finally:
+        vars(main).update(saved)
+
+
+def _warm():
+    """Worker initializer: compile every site's selectors before the first page arrives"""
+    for name in load_schemas():
+        get_extractor(name)
+
+
+def _ready():
+    return True
+
+
+def _extract_in_worker(name, content):
+    return get_extractor(name).extract_all(content)
+
+
+class ParsePool:
+    """
+    Runs HTML extraction in warm worker processes, off the event loop.
+
+    Raw page bytes go to a ProcessPoolExecutor whose workers have already
+    compiled the site schemas; only the extracted records and page-level
+    fields come back. Until `start()` (and always when `workers` is 0)
+    every page is parsed in-process, as are pages below `inline_bytes`. At most `queue_size` pages
+    are queued or parsing at once; beyond that callers wait, so a burst of
+    scrapes cannot grow the backlog without bound. The page cache is
+    consulted and filled here, in the server process, exactly as for
+    inline parsing.
+
+    Workers come from a forkserver that preloads only this module and
+    extract.py. Workers are started with the launching script hidden, so a
+    parser never imports server.py (FastAPI, NumPy and the rest) as
+    `__mp_main__`; entry points still guard themselves with
+    `if __name__ == "__main__"`, as any multiprocessing user must. A
+    crashed worker replaces the pool and the page it was parsing is parsed
+    on a thread.
+    """
+
+    def __init__(self, workers=PARSE_WORKERS, inline_bytes=PARSE_INLINE_BYTES, queue_size=PARSE_QUEUE):
+        self.workers = workers
+        self.inline_bytes = inline_bytes
+        self.queue_size = queue_size
+        self._executor = None
+        self.running = False
+        self._slots = asyncio.Semaphore(queue_size)
+        self._in_flight = 0
+        self.counters = {"pooled": 0, "inline": 0, "cached": 0, "waited": 0, "restarts": 0}
+
+    def _executor_or_start(self):
+        if self._executor is None:
+            # Fresh interpreters that import only this module: forking the server would copy its
+            # threads' locks, its sockets and its caches into every parser
+            context = multiprocessing.get_context("forkserver")
+            # Only the parsing modules; never "__main__", so the forkserver does not load the server either
+            context.set_forkserver_preload(["parse_pool", "extract"])
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_warm)
+        return self._executor
+
+    async def start(self):
+        """Launch every worker and wait until each has compiled its extractors"""
+        if self.workers <= 0:
+            return
+        executor = self._executor_or_start()
+        self.running = True
+        loop = asyncio.get_running_loop()
+        # One task per worker spawns each process; waiting on them covers the imports and _warm
+        with _main_module_hidden():
+            ready = [loop.run_in_executor(executor, _ready) for _ in range(self.workers)]
+        await asyncio.gather(*ready)
+        log.info(f"✅ Parse pool ready with {self.workers} workers")
+
+    async def extract(self, name, content, limit=None, digest=None):
+        """Same contract as Extractor.extract, without blocking the loop on large pages"""
+        extractor = get_extractor(name)
+        if not self.running or not content or len(content) < self.inline_bytes:
+            self.counters["inline"] += 1
+            return extractor.extract(content, limit, digest)
+
+        # The page cache is SQLite: its lookup and commit go to a thread, as the engine's do
+        page_cached = bool(digest) and get_http_cache() is not None
+        with stage("parse"):
+            cached = await asyncio.to_thread(extractor.cached, digest, limit) if page_cached else None
+            if cached is not None:
+                self.counters["cached"] += 1
+                return cached
+            records, page = await self._submit(name, content)
+            if page_cached:
+                await asyncio.to_thread(extractor.remember, digest, records, page)
+        self.counters["pooled"] += 1
+        return records[:limit] if limit is not None else records, page
+
+    async def _submit(self, name, content):
+        if self._slots.locked():
+            self.counters["waited"] += 1
+        async with self._slots:
+            executor = self._executor_or_start()
+            self._in_flight += 1
+            try:
+                # Submitting may start a replacement worker process
+                with _main_module_hidden():
+                    parsed = asyncio.get_running_loop().run_in_executor(executor, _extract_in_worker, name, content)
+                return await parsed
+            except BrokenProcessPool:
+                if self._executor is executor:
+                    self.counters["restarts"] += 1
+                    log.warning("⚠️ Parse worker died; restarting the pool")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = None
+                # Still a large page: parse it on a thread, not on the loop
+                return await asyncio.to_thread(get_extractor(name).extract_all, content)
+            finally:
+                self._in_flight -= 1
+
+    def stats(self):
+        return {
+            **self.counters,
+            "workers": self.workers,
+            "running": self.running,
+            "inline_bytes": self.inline_bytes,
+            "queue_size": self.queue_size,
+            "in_flight": self._in_flight,
+        }
+
+    async def close(self):
+        self.running = False
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+
+_pool = None
+
+
+def get_parse_pool():
+    """Process-wide parse pool; pages parse inline until the server starts it"""
+    global _pool
+    if _pool is None:
+        _pool = ParsePool()
+    return _pool
+
+
+async def close_parse_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from datetime import datetime
+
+from logs import get_logger
+
+# Searches kept warm: the N most popular, refreshed this long before their cache entry expires
+PREWARM_TOP_N = int(os.environ.get("PREWARM_TOP_N", 20))
+PREWARM_LEAD = float(os.environ.get("PREWARM_LEAD", 120))
+# Seconds between scheduling passes, and concurrent re-scrapes allowed
+PREWARM_INTERVAL = float(os.environ.get("PREWARM_INTERVAL", 60))
+PREWARM_CONCURRENCY = int(os.environ.get("PREWARM_CONCURRENCY", 2))
+# Popularity halves after this many seconds without requests
+PREWARM_HALF_LIFE = float(os.environ.get("PREWARM_HALF_LIFE", 3600))
+# Decayed request count a search needs before it is worth keeping warm
+PREWARM_MIN_SCORE = float(os.environ.get("PREWARM_MIN_SCORE", 2))
+# Local hours ("9-18") in which prewarming runs; empty means all day
+PREWARM_HOURS = os.environ.get("PREWARM_HOURS", "")
+# Distinct searches tracked; the least popular are forgotten first
+MAX_TRACKED = 10_000
+
+log = get_logger("prewarm")
+
+
+def parse_hours(value):
+    """(start, end) hours from "9-18", or None for all day"""
+    if not value or not value.strip():
+        return None
+    start, _, end = value.partition("-")
+    return int(start), int(end or 24)
+
+
+def in_hours(hours, now=None):
+    if hours is None:
+        return True
+    hour = (now or datetime.now()).hour
+    start, end = hours
+    # A window such as "20-6" wraps past midnight
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+class PopularityTracker:
+    """
+    Exponentially decayed request counts per search.
+
+    Instead of decaying every score on every tick, each hit is weighted by
+    2 ** (t / half_life); scores grow over time but stay comparable, so
+    ranking needs no updates. Weights are rebased before they overflow.
+    """
+
+    # Rebase once weights pass 2 ** REBASE_EXPONENT
+    REBASE_EXPONENT = 512
+
+    def __init__(self, half_life=PREWARM_HALF_LIFE, max_tracked=MAX_TRACKED):
+        self.half_life = half_life
+        self.max_tracked = max_tracked
+        self._epoch = time.time()
+        self._scores = {}
+        self._queries = {}
+
+    def _weight(self, now):
+        exponent = (now - self._epoch) / self.half_life
+        if exponent > self.REBASE_EXPONENT:
+            scale = 2.0 ** -exponent
+            self._scores = {key: score * scale for key, score in self._scores.items()}
+            self._epoch = now
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def hit(self, key, query, kind, now=None):
+        self._scores[key] = self._scores.get(key, 0.0) + self._weight(now or time.time())
+        self._queries[key] = (query, kind)
+        if len(self._scores) > self.max_tracked * 1.1:
+            self._prune()
+
+    def _prune(self):
+        keep = heapq.nlargest(self.max_tracked, self._scores.items(), key=lambda item: item[1])
+        self._scores = dict(keep)
+        self._queries = {key: self._queries[key] for key in self._scores}
+
+    def score(self, key, now=None):
+        """Current decayed request count of a search"""
+        now = now or time.time()
+        return self._scores.get(key, 0.0) * 2.0 ** -((now - self._epoch) / self.half_life)
+
+    def top(self, n, min_score=0.0, now=None):
+        """[(score, key, query, kind)] for the n most popular searches scoring at least min_score"""
+        now = now or time.time()
+        decay = 2.0 ** -((now - self._epoch) / self.half_life)
+        best = heapq.nlargest(n, self._scores.items(), key=lambda item: item[1])
+        return [
+            (score * decay, key, *self._queries[key])
+            for key, score in best
+            if score * decay >= min_score
+        ]
+
+    def __len__(self):
+        return len(self._scores)
+
+
+class Prewarmer:
+    """
+    Background scheduler keeping popular searches in the result cache.
+
+    Every `interval` seconds the top-N searches whose cache entry is
+    missing or within `lead` seconds of expiring are pushed onto a priority
+    queue, most popular first; `concurrency` workers re-scrape them through
+    `refresh(key, query, kind)`. Re-scrapes pass through the aggregator, so
+    they also append fresh price history.
+    """
+
+    def __init__(self, cache, refresh, top_n=PREWARM_TOP_N, lead=PREWARM_LEAD, interval=PREWARM_INTERVAL,
+                 concurrency=PREWARM_CONCURRENCY, min_score=PREWARM_MIN_SCORE, hours=PREWARM_HOURS,
+                 tracker=None):
+        self.cache = cache
+        self.refresh = refresh
+        self.top_n = top_n
+        self.lead = lead
+        self.interval = interval
+        self.concurrency = concurrency
+        self.min_score = min_score
+        self.hours = parse_hours(hours)
+        self.tracker = tracker or PopularityTracker()
+        self._queue = asyncio.PriorityQueue()
+        self._pending = set()
+        self._order = itertools.count()
+        self._tasks = []
+        self.counters = {"passes": 0, "scheduled": 0, "refreshed": 0, "failures": 0, "skipped_hours": 0}
+
+    @property
+    def enabled(self):
+        return self.top_n > 0 and self.concurrency > 0
+
+    def track(self, key, query, kind):
+        """Count one user request for a search"""
+        self.tracker.hit(key, query, kind)
+
+    async def schedule(self):
+        """Queue the popular searches that are due; returns how many were queued"""
+        self.counters["passes"] += 1
+        if not in_hours(self.hours):
+            self.counters["skipped_hours"] += 1
+            return 0
+        due_after = self.cache.ttl - self.lead
+        queued = 0
+        for score, key, query, kind in self.tracker.top(self.top_n, self.min_score):
+            if key in self._pending:
+                continue
+            age = await self.cache.age(key)
+            if age is not None and age < due_after:
+                continue
+            self._pending.add(key)
+            self._queue.put_nowait((-score, next(self._order), key, query, kind))
+            queued += 1
+        self.counters["scheduled"] += queued
+        return queued
+
+    async def _worker(self):
+        while True:
+            _, _, key, query, kind = await self._queue.get()
+            try:
+                await self.refresh(key, query, kind)
+                self.counters["refreshed"] += 1
+            except Exception as e:
+                self.counters["failures"] += 1
+                log.warning(f"❌ Prewarm of {query.item_name} failed: {e}")
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
+
+    async def _scheduler(self):
+        while True:
+            try:
+                await self.schedule()
+            except Exception as e:
+                log.error(f"❌ Prewarm scheduling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if not self.enabled or self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._scheduler()))
+        log.info(f"🔥 Prewarming the top {self.top_n} searches every {self.interval:g}s")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        return {
+            **self.counters,
+            "enabled": self.enabled,
+            "tracked": len(self.tracker),
+            "queued": self._queue.qsize(),
+            "top": [
+                {"query": query.item_name, "kind": kind, "score": round(score, 2)}
+                for score, _, query, kind in self.tracker.top(5)
+            ],
+        }
@@ -0,0 +1,101 @@
+import numpy as np
+
+from records import parse_number
+
+# Prices outside [Q1 - k*IQR, Q3 + k*IQR] are flagged as outliers
+IQR_FENCE = 1.5
+# Share of the rating/review score an outlier price keeps
+OUTLIER_PENALTY = 0.5
+
+
+def _parse(text):
+    value = parse_number(text)
+    return np.nan if value is None else value
+
+
+def _column(results, key):
+    if key is None:
+        return np.full(len(results), np.nan)
+    return np.fromiter((_parse(product.get(key)) for product in results), dtype=float, count=len(results))
+
+
+def _json_number(value, digits=2):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def price_statistics(prices):
+    """Summary statistics and IQR fences over the valid (positive) prices"""
+    valid = prices[prices > 0]
+    if not valid.size:
+        return {"priced_results": 0}, np.nan, np.nan
+
+    q1, median, q3 = np.percentile(valid, [25, 50, 75])
+    iqr = q3 - q1
+    lower, upper = q1 - IQR_FENCE * iqr, q3 + IQR_FENCE * iqr
+    return {
+        "priced_results": int(valid.size),
+        "mean_price": _json_number(valid.mean()),
+        "median_price": _json_number(median),
+        "min_price": _json_number(valid.min()),
+        "max_price": _json_number(valid.max()),
+        "q1_price": _json_number(q1),
+        "q3_price": _json_number(q3),
+        "iqr": _json_number(iqr),
+        "outlier_bounds": [_json_number(lower), _json_number(upper)],
+    }, lower, upper
+
+
+def score_columns(prices, ratings, reviews):
+    """
+    Score parsed columns; returns (statistics, outlier mask, scores).
+
+    The score keeps the client's formula, min(100, rating * 20 + reviews / 10),
+    and halves it for products whose price falls outside the IQR fences of
+    the result set.
+    """
+    statistics, lower, upper = price_statistics(prices)
+    with np.errstate(invalid="ignore"):
+        outliers = (prices > 0) & ((prices < lower) | (prices > upper))
+
+    scores = np.minimum(100.0, np.nan_to_num(ratings) * 20 + np.nan_to_num(reviews) / 10)
+    scores = np.where(outliers, scores * OUTLIER_PENALTY, scores)
+
+    statistics["outliers"] = int(outliers.sum())
+    if not np.isnan(ratings).all():
+        statistics["average_rating"] = _json_number(np.nanmean(ratings), 1)
+    return statistics, outliers, scores
+
+
+def annotate_batch(batch):
+    """Score a ProductBatch from its typed columns; scores are kept on the batch"""
+    if not len(batch):
+        return {"priced_results": 0}
+    statistics, batch.outliers, batch.scores = score_columns(*batch.columns())
+    return statistics
+
+
+def annotate_results(results, price_key="Price", rating_key="Rating", reviews_key="Reviews"):
+    """
+    Parse display strings into numeric columns once and score every row.
+
+    For result dicts that are not ProductRecords (service providers). Adds
+    price_value, rating_value, review_count, price_outlier and
+    reasonability_score next to the existing display fields (in place) and
+    returns the statistics.
+    """
+    if not results:
+        return {"priced_results": 0}
+
+    prices = _column(results, price_key)
+    ratings = _column(results, rating_key)
+    reviews = _column(results, reviews_key)
+    statistics, outliers, scores = score_columns(prices, ratings, reviews)
+
+    for index, product in enumerate(results):
+        if price_key is not None:
+            product["price_value"] = _json_number(prices[index])
+            product["price_outlier"] = bool(outliers[index])
+        product["rating_value"] = _json_number(ratings[index], 1)
+        product["review_count"] = None if np.isnan(reviews[index]) else int(reviews[index])
+        product["reasonability_score"] = round(float(scores[index]), 1)
+    return statistics
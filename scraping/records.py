@@ -0,0 +1,205 @@
+import re
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_CURRENCIES = (("₹", "₹"), ("rs", "₹"), ("inr", "₹"), ("£", "£"), ("$", "$"), ("€", "€"))
+DEFAULT_CURRENCY = "₹"
+
+
+def _intern(value):
+    return sys.intern(value) if value else value
+
+
+def parse_number(text):
+    """First number in a display string ("₹45,000", "4.2 stars", "(1,234)"); None if none"""
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    match = _NUMBER.search(str(text).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def parse_price(text):
+    """(price in paise/pence/cents, currency symbol) from a display price"""
+    value = parse_number(text)
+    if value is None:
+        return None, DEFAULT_CURRENCY
+    lowered = str(text).strip().lower()
+    currency = next((symbol for prefix, symbol in _CURRENCIES if lowered.startswith(prefix)), DEFAULT_CURRENCY)
+    return int(round(value * 100)), currency
+
+
+def format_price(price_paise, currency=DEFAULT_CURRENCY):
+    if price_paise is None:
+        return "Price not available"
+    whole, fraction = divmod(price_paise, 100)
+    return f"{currency}{whole:,}" if not fraction else f"{currency}{price_paise / 100:,.2f}"
+
+
+class ProductRecord:
+    """
+    Compact product row shared by every scraper.
+
+    Prices are integer paise (minor units), rating is a float and the review
+    count an int; seller, website, currency and source strings are interned
+    so repeated values cost one object. Timestamps live on the batch.
+    `synthetic` marks generated placeholder rows, which are shown to users
+    but never stored as price observations or indexed.
+    """
+
+    __slots__ = ("name", "seller", "price_paise", "currency", "rating", "review_count",
+                 "reviews_text", "specifications", "website", "source", "synthetic")
+
+    def __init__(self, name, seller, price_paise=None, rating=None, review_count=None, specifications=None,
+                 website=None, source=None, currency=DEFAULT_CURRENCY, reviews_text=None, synthetic=False):
+        self.name = name
+        self.seller = _intern(seller)
+        self.price_paise = price_paise
+        self.currency = _intern(currency)
+        self.rating = rating
+        self.review_count = review_count
+        # Non-numeric review labels such as "Government certified"
+        self.reviews_text = reviews_text
+        self.specifications = specifications
+        self.website = _intern(website)
+        self.source = _intern(source)
+        self.synthetic = synthetic
+
+    @classmethod
+    def from_display(cls, name, seller, price, rating=None, reviews=None, specifications=None, website=None,
+                     source=None):
+        """Build a record from scraped display strings"""
+        price_paise, currency = parse_price(price)
+        review_count = parse_number(reviews)
+        return cls(
+            name, seller, price_paise,
+            rating=parse_number(rating),
+            review_count=int(review_count) if review_count is not None else None,
+            specifications=specifications,
+            website=website,
+            source=source,
+            currency=currency,
+            reviews_text=reviews if review_count is None else None,
+        )
+
+    @property
+    def price(self):
+        return None if self.price_paise is None else self.price_paise / 100
+
+    def fold(self, other):
+        """Fill fields this record is missing from a duplicate of it"""
+        for field in ("price_paise", "rating", "review_count", "specifications", "website"):
+            if getattr(self, field) is None and getattr(other, field) is not None:
+                setattr(self, field, getattr(other, field))
+
+    def to_dict(self, last_updated):
+        if self.review_count is not None:
+            reviews = f"{self.review_count} reviews"
+        else:
+            reviews = self.reviews_text or "No Reviews"
+        return {
+            "Product Name": self.name,
+            "Seller": self.seller,
+            "Price": format_price(self.price_paise, self.currency),
+            "Rating": f"{self.rating:.1f} stars" if self.rating is not None else "No rating",
+            "Reviews": reviews,
+            "Specifications": self.specifications or "No specifications",
+            "Website": self.website,
+            "Last Updated": last_updated,
+            "Source": self.source,
+        }
+
+    def to_state(self):
+        return [getattr(self, field) for field in self.__slots__]
+
+    @classmethod
+    def from_state(cls, state):
+        record = cls.__new__(cls)
+        # States cached before the flag existed are one field short
+        record.synthetic = False
+        for field, value in zip(cls.__slots__, state):
+            setattr(record, field, _intern(value) if field in ("seller", "currency", "website", "source") else value)
+        return record
+
+
+class ProductBatch:
+    """
+    Records from one scrape sharing a single epoch timestamp.
+
+    Iterates like a list of ProductRecord; `columns()` gives the numeric
+    fields as NumPy arrays for bulk statistics and scoring, whose results
+    are kept on the batch and emitted by `to_dicts()`.
+    """
+
+    __slots__ = ("records", "scraped_at", "scores", "outliers")
+
+    def __init__(self, records=None, scraped_at=None):
+        self.records = list(records or [])
+        self.scraped_at = scraped_at if scraped_at is not None else time.time()
+        self.scores = None
+        self.outliers = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def append(self, record):
+        self.records.append(record)
+
+    def columns(self):
+        """price (major units), rating and review count as float arrays, NaN where missing"""
+        count = len(self.records)
+        prices = np.fromiter(
+            (np.nan if r.price_paise is None else r.price_paise / 100 for r in self.records), float, count
+        )
+        ratings = np.fromiter((np.nan if r.rating is None else r.rating for r in self.records), float, count)
+        reviews = np.fromiter(
+            (np.nan if r.review_count is None else r.review_count for r in self.records), float, count
+        )
+        return prices, ratings, reviews
+
+    @property
+    def last_updated(self):
+        return datetime.fromtimestamp(self.scraped_at).strftime("%Y-%m-%d %H:%M:%S")
+
+    def to_dicts(self):
+        """API rows: display strings plus typed fields"""
+        last_updated = self.last_updated
+        rows = []
+        for index, record in enumerate(self.records):
+            row = record.to_dict(last_updated)
+            row["price_value"] = record.price
+            row["rating_value"] = record.rating
+            row["review_count"] = record.review_count
+            if self.scores is not None:
+                row["price_outlier"] = bool(self.outliers[index])
+                row["reasonability_score"] = round(float(self.scores[index]), 1)
+            rows.append(row)
+        return rows
+
+    def to_state(self):
+        """Compact JSON-able form for the on-disk cache tier"""
+        return {
+            "scraped_at": self.scraped_at,
+            "records": [record.to_state() for record in self.records],
+            "scores": None if self.scores is None else self.scores.tolist(),
+            "outliers": None if self.outliers is None else self.outliers.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        batch = cls([ProductRecord.from_state(row) for row in state["records"]], state["scraped_at"])
+        if state.get("scores") is not None:
+            batch.scores = np.asarray(state["scores"], dtype=float)
+            batch.outliers = np.asarray(state["outliers"], dtype=bool)
+        return batch
@@ -0,0 +1,135 @@
+"""
+Production entry point: the FastAPI service under gunicorn with N uvicorn workers.
+
+    python serve.py --workers 8 --bind 0.0.0.0:8000
+
+The app is imported and warmed in the master before it forks: the
+taxonomy matchers, price model, location geocoder and compiled site
+extractors are built once and then frozen out of the garbage collector,
+so every worker shares those pages copy-on-write instead of building and
+dirtying its own. Workers share search results through an mmap'd cache
+file (shmcache.py) on top of their in-process LRU, and one worker at a
+time runs the prewarm scheduler. Each worker's parse pool is sized from
+its share of the cores, and left off when the workers already fill them.
+`python server.py` still runs a single process for development.
+"""
+import argparse
+import fcntl
+import gc
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from shmcache import default_path
+
+DEFAULT_BIND = "0.0.0.0:8000"
+# Slow upstream sources are bounded by the engine's own deadlines; this only catches hung workers
+WORKER_TIMEOUT = 120
+GRACEFUL_TIMEOUT = 30
+
+# Held by the worker running the prewarm scheduler, released when it exits
+_prewarm_lock = None
+
+
+def warm():
+    """Import the app and build every read-only structure once, before forking"""
+    from server import app
+    from estimator import get_estimator
+    from taxonomy import get_taxonomy
+    from justdial import get_geocoder
+    from extract import load_schemas, get_extractor
+
+    get_estimator()
+    get_taxonomy()
+    get_geocoder()
+    for name in load_schemas():
+        get_extractor(name)
+    # Objects alive now are never collected; keeping the collector off them keeps their pages shared
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def claim_prewarm(path):
+    """True in the one worker that holds the prewarm lock file"""
+    global _prewarm_lock
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _prewarm_lock = fd
+    return True
+
+
+def post_fork(arbiter, worker):
+    import server
+    from logs import start_logging
+
+    # Each worker writes its logs from its own listener thread
+    start_logging()
+    # Every worker would otherwise re-scrape the same popular searches
+    if server.prewarmer.enabled and not claim_prewarm(os.environ["SCRAPE_SHARED_CACHE"] + ".prewarm"):
+        server.prewarmer.top_n = 0
+
+
+def on_exit(arbiter):
+    path = os.environ["SCRAPE_SHARED_CACHE"]
+    for leftover in (path, path + ".prewarm"):
+        try:
+            os.unlink(leftover)
+        except FileNotFoundError:
+            pass
+
+
+class ScraperApplication(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return warm()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the scraping API with preforked workers")
+    parser.add_argument("--bind", default=DEFAULT_BIND)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=int, default=WORKER_TIMEOUT)
+    parser.add_argument("--max-requests", type=int, default=0,
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--shared-cache", help="mmap'd cache file shared by the workers (default under /dev/shm)")
+    parser.add_argument("--shared-cache-mb", type=int, help="size of the shared cache file")
+    args = parser.parse_args()
+
+    # Read by cache.py, shmcache.py and parse_pool.py when the master imports the app
+    os.environ["SCRAPE_SHARED_CACHE"] = args.shared_cache or default_path()
+    # Parser processes are sized from each worker's share of the cores
+    os.environ["SCRAPE_SERVER_WORKERS"] = str(args.workers)
+    if args.shared_cache_mb:
+        os.environ["SCRAPE_SHARED_CACHE_MB"] = str(args.shared_cache_mb)
+
+    ScraperApplication({
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "timeout": args.timeout,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10,
+        # Heartbeat files on tmpfs, so a slow disk never looks like a hung worker
+        "worker_tmp_dir": "/dev/shm" if os.path.isdir("/dev/shm") else None,
+        "loglevel": os.environ.get("LOG_LEVEL", "info").lower(),
+        "post_fork": post_fork,
+        "on_exit": on_exit,
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
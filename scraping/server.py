@@ -1,18 +1,111 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from google import scrape_product_details_google
-import json
+from engine import close_engine, get_policy
+from httpcache import get_http_cache
+from sources import (
+    SearchQuery, MAKE_MODEL, SPECS, fetch_retailer_catalog, CATALOG_SYNC_INTERVAL, BROWSER_SOURCES, RETAILER_SOURCE
+)
+from browser import get_browser_pool, close_browser_pool
+from parse_pool import get_parse_pool, close_parse_pool
+from aggregator import aggregate, aggregate_iter
+from collector import ResultCollector
+from cache import ResultCache, make_cache_key
+from coalesce import SingleFlight
+from batch import run_bounded, MAX_BATCH_ITEMS
+from streaming import event_stream_response, NDJSON, STREAM_FORMATS
+from pricing import annotate_results, annotate_batch
+from records import ProductRecord, ProductBatch
+from history import get_history, close_history, DEFAULT_DAYS
+from estimator import get_estimator
+from specindex import SpecIndex, MIN_MATCHES
+from taxonomy import get_taxonomy
+from prewarm import Prewarmer
+from justdial import (SERVICES, SOURCE as SERVICE_SOURCE, location_bucket, search_description,
+                      scrape_service_providers_justdial, rank_by_locality, JUSTDIAL_DEADLINE)
+from collector import normalize_identity
+from metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware, stage
+from logs import get_logger, start_logging, stop_logging
+from contextlib import asynccontextmanager
+import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime
 import random
+import time
+
+log = get_logger("server")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_logging()
+    # Load the price model and compile the taxonomy once, before the first request
+    get_estimator()
+    get_taxonomy()
+    # Parser processes up and their selectors compiled before the first large page
+    await get_parse_pool().start()
+    if BROWSER_SOURCES:
+        # Launch Chromium and open the warm pages before the first rendered search
+        try:
+            await get_browser_pool().start()
+        except Exception as e:
+            log.warning(f"⚠️ Browser pool unavailable, rendered searches will fall back: {e}")
+    catalog_sync = asyncio.create_task(sync_retailer_catalog())
+    prewarmer.start()
+    yield
+    catalog_sync.cancel()
+    await prewarmer.stop()
+    # Release the shared scraping connection pool on shutdown
+    await result_cache.close()
+    await service_cache.close()
+    await close_engine()
+    await close_browser_pool()
+    await close_parse_pool()
+    # Flush queued price observations before exiting
+    await asyncio.to_thread(close_history)
+    stop_logging()
+
+def encode_search(value):
+    return {**value, "results": value["results"].to_state()}
+
+def decode_search(value):
+    return {**value, "results": ProductBatch.from_state(value["results"])}
+
+# Searches are cached as ProductBatch objects and rendered to dicts per response
+result_cache = ResultCache(encode=encode_search, decode=decode_search)
+# Service-provider listings, cached per (location bucket, description)
+service_cache = ResultCache()
+# Identical searches arriving together share one upstream scrape
+inflight_searches = SingleFlight()
+# Scraped results and the retailer catalog, searchable by normalized spec terms; entries age out with the cache
+spec_index = SpecIndex(ttl=result_cache.ttl)
+# Popular searches re-scraped in the background before their cache entries expire
+prewarmer = Prewarmer(result_cache, lambda key, query, kind: prewarm_search(key, query, kind))
+
+async def sync_retailer_catalog():
+    """Mirror the Express product catalog into the spec index, periodically"""
+    while True:
+        try:
+            catalog = await fetch_retailer_catalog()
+            removed = spec_index.replace_source(RETAILER_SOURCE, catalog)
+            log.info(f"✅ Indexed {sum(map(len, catalog.values()))} retailer products, dropped {removed}")
+        except Exception as e:
+            log.warning(f"❌ Retailer catalog sync failed: {e}")
+        await asyncio.sleep(CATALOG_SYNC_INTERVAL)
 
 app = FastAPI(
     title="Government Procurement Scraping API", 
     version="1.0.0",
-    description="API for scraping product data for government procurement price benchmarking"
+    description="API for scraping product data for government procurement price benchmarking",
+    lifespan=lifespan,
+    # Serialize responses once with orjson instead of the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
+# Per-route latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -32,8 +125,28 @@ class ItemRequest_form2(BaseModel):
     item_name: str
     specifications: Optional[List[Dict[str, str]]] = None
 
+class BatchItem(BaseModel):
+    """One BOQ line item: form1 fields (seller/model) or form2 fields (specifications)"""
+    category: str
+    item_name: str
+    seller: Optional[str] = None
+    model: Optional[str] = None
+    specifications: Optional[List[Dict[str, str]]] = None
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
+class PriceQuery(BaseModel):
+    item_name: str
+    seller: Optional[str] = None
+    model: Optional[str] = None
+    specifications: Optional[List[Dict[str, str]]] = None
+
+class PricePredictionRequest(BaseModel):
+    items: List[PriceQuery]
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {
         "message": "Government Procurement Scraping API",
         "status": "running",
@@ -41,37 +154,182 @@ def read_root():
         "endpoints": {
             "make_model_search": "/scrape-make-model/{category}",
             "specs_search": "/scrape-specs/{category}",
+            "batch_benchmark": "/benchmark/batch",
+            "price_history": "/price-history?item_name=...",
+            "price_prediction": "/predict-price",
+            "streaming": "/scrape-make-model/{category}/stream, /scrape-specs/{category}/stream, /scrape-service-providers/{service_type}/stream",
             "categories": ["electronics", "medical", "construction"],
             "docs": "/docs",
             "health": "/health"
         }
     }
 
+CACHE_LOOKUPS = REGISTRY.counter("scraper_cache_lookups_total", "Result cache lookups by outcome", ("result",))
+CACHE_HIT_RATIO = REGISTRY.gauge("scraper_cache_hit_ratio", "Share of result cache lookups answered from cache")
+CACHE_ENTRIES = REGISTRY.gauge("scraper_cache_entries", "Searches held in the in-memory result cache")
+SEARCHES_IN_FLIGHT = REGISTRY.gauge("scraper_searches_in_flight", "Distinct upstream searches running")
+SEARCHES_COALESCED = REGISTRY.counter("scraper_searches_coalesced_total", "Searches that joined one already running")
+FETCHES = REGISTRY.counter("scraper_fetch_total", "Upstream fetch scheduler events", ("event",))
+BREAKERS_OPEN = REGISTRY.gauge("scraper_circuit_open", "1 while a source's circuit breaker is open", ("source",))
+INDEXED_PRODUCTS = REGISTRY.gauge("scraper_spec_index_documents", "Products searchable in the spec index")
+PAGES_PARSED = REGISTRY.counter("scraper_pages_parsed_total", "Pages extracted, by where they were parsed", ("where",))
+PARSE_IN_FLIGHT = REGISTRY.gauge("scraper_parse_pool_in_flight", "Pages queued or parsing in the parse pool")
+
+@REGISTRY.collect
+def collect_service_metrics():
+    cache = result_cache.stats()
+    for result in ("hits", "disk_hits", "stale_hits", "misses"):
+        CACHE_LOOKUPS.set(cache[result], result=result)
+    CACHE_HIT_RATIO.set(cache["hit_ratio"])
+    CACHE_ENTRIES.set(cache["entries"])
+    coalescing = inflight_searches.stats()
+    SEARCHES_IN_FLIGHT.set(coalescing["in_flight"])
+    SEARCHES_COALESCED.set(coalescing["coalesced"])
+    fetch = get_policy().stats()
+    for event in ("requests", "retries", "throttled", "rejected"):
+        FETCHES.set(fetch[event], event=event)
+    for source, state in fetch["breakers"].items():
+        BREAKERS_OPEN.set(int(state == "open"), source=source)
+    INDEXED_PRODUCTS.set(len(spec_index))
+    parsing = get_parse_pool().stats()
+    for where in ("pooled", "inline", "cached"):
+        PAGES_PARSED.set(parsing[where], where=where)
+    PARSE_IN_FLIGHT.set(parsing["in_flight"])
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of request, stage, source and cache metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 @app.get("/health")
-def health_check():
+async def health_check():
     return {
         "status": "healthy", 
         "message": "API is running properly",
-        "timestamp": "2025-07-30"
+        "timestamp": "2025-07-30",
+        "cache": result_cache.stats(),
+        "service_cache": service_cache.stats(),
+        "coalescing": inflight_searches.stats(),
+        "spec_index": spec_index.stats(),
+        "prewarm": prewarmer.stats(),
+        "fetch": get_policy().stats(),
+        "http_cache": get_http_cache().stats() if get_http_cache() is not None else None,
+        "browser": get_browser_pool().stats() if BROWSER_SOURCES else None,
+        "parse_pool": get_parse_pool().stats(),
+        "price_history": get_history().stats() if get_history() is not None else None
     }
 
+async def cached_search(query, kind):
+    """
+    Aggregated, scored search through the result cache.
+
+    Returns ({"results", "sources", "statistics"}, cache state).
+    """
+    key = make_cache_key(kind, query.category, query.item_name, query.seller, query.model, query.specifications)
+    prewarmer.track(key, query, kind)
+    return await result_cache.get_or_load(key, search_loader(key, query, kind), cacheable=has_results)
+
+def has_results(value):
+    return bool(value["results"])
+
+def search_loader(key, query, kind):
+    """Coalesced scrape producing the cached value for a search"""
+    async def scrape():
+        results, source_status = await aggregate(query, kind)
+        spec_index.add_batch(results, query.category)
+        # Typed fields and statistics are computed once and cached with the results
+        with stage("normalize"):
+            statistics = annotate_batch(results)
+        return {"results": results, "sources": source_status, "statistics": statistics}
+
+    async def load():
+        return await inflight_searches.do(key, scrape)
+
+    return load
+
+async def cached_service_search(bucket, description):
+    """
+    Providers for one description in a location bucket, through the service cache.
+
+    Raises asyncio.TimeoutError after JUSTDIAL_DEADLINE seconds; the scrape
+    itself carries on and caches its listing for the next request.
+    """
+    key = make_cache_key(SERVICES, None, description, bucket.key)
+
+    async def scrape():
+        return await scrape_service_providers_justdial(bucket.city, description)
+
+    async def load():
+        return await inflight_searches.do(key, scrape)
+
+    search = asyncio.ensure_future(service_cache.get_or_load(key, load))
+    # Nobody may be left to read a late failure
+    search.add_done_callback(lambda done: done.cancelled() or done.exception())
+    return await asyncio.wait_for(asyncio.shield(search), timeout=JUSTDIAL_DEADLINE)
+
+async def find_service_providers(service_type, location, services):
+    """
+    Providers for every requested service near a location.
+
+    Each description is searched concurrently in the location's city bucket,
+    so "Andheri East" and "Powai, Mumbai" share cached listings; results are
+    merged, then ranked with the requested locality first. A description
+    whose listing is not ready within JUSTDIAL_DEADLINE is left out. Returns
+    (providers, source, metadata); falls back to generated data when no
+    listing could be fetched in time.
+    """
+    bucket = location_bucket(location)
+    descriptions = list(dict.fromkeys(search_description(service_type, service) for service in services or [None]))
+    searches = await asyncio.gather(
+        *(cached_service_search(bucket, description) for description in descriptions), return_exceptions=True
+    )
+
+    providers, states, errors = {}, {}, {}
+    for description, search in zip(descriptions, searches):
+        if isinstance(search, asyncio.TimeoutError):
+            states[description] = "timeout"
+            errors[description] = f"exceeded {JUSTDIAL_DEADLINE}s deadline"
+            continue
+        if isinstance(search, Exception):
+            errors[description] = str(search)
+            continue
+        listing, states[description] = search
+        for provider in listing:
+            key = (normalize_identity(provider["service_provider"]), normalize_identity(provider["phone"]))
+            providers.setdefault(key, provider)
+
+    metadata = {"location_bucket": bucket.city, "cache": states}
+    if errors:
+        metadata["errors"] = errors
+    if not providers:
+        return generate_service_provider_data(service_type, location, services), "Service Provider Mock Data", metadata
+    return rank_by_locality(list(providers.values()), bucket.locality), SERVICE_SOURCE, metadata
+
+async def prewarm_search(key, query, kind):
+    """Re-scrape a popular search into the cache before its entry expires"""
+    await result_cache.refresh(key, search_loader(key, query, kind), cacheable=has_results)
+
 @app.post("/scrape-make-model/{category}")
-def scrape_products(category: str, request: ItemRequest_form1):
+async def scrape_products(category: str, request: ItemRequest_form1):
     """
     Scrape products by make/model for government procurement - GUARANTEED to return data
     """
+    payload = await search_make_model(category, request)
+    # Returning the response directly skips FastAPI's jsonable_encoder pass
+    with stage("serialize"):
+        return ORJSONResponse(payload)
+
+async def search_make_model(category, request):
+    """Make/model search returning the response payload"""
     try:
-        print(f"🚀 SCRAPING REQUEST RECEIVED")
-        print(f"📋 Category: {category}")
-        print(f"📋 Item: {request.item_name}")
-        print(f"📋 Seller: {request.seller}")
-        print(f"📋 Model: {request.model}")
-        print(f"========================")
+        log.info("🚀 Make/model search", extra={
+            "category": category, "item": request.item_name, "seller": request.seller, "model": request.model
+        })
         
         # Validate category
         valid_categories = ["electronics", "medical", "construction"]
         if category not in valid_categories:
-            print(f"❌ Invalid category: {category}")
+            log.info(f"❌ Invalid category: {category}")
             raise HTTPException(
                 status_code=400, 
                 detail=f"Invalid category '{category}'. Valid categories: {valid_categories}"
@@ -79,45 +337,25 @@ def scrape_products(category: str, request: ItemRequest_form1):
 
         # Validate input
         if not request.item_name or request.item_name.strip() == "":
-            print("❌ Empty item name")
+            log.info("❌ Empty item name")
             raise HTTPException(
                 status_code=400,
                 detail="Item name is required and cannot be empty"
             )
 
-        # Execute scraping - This will ALWAYS return data
-        print(f"🔍 Starting product search...")
-        result_json = scrape_product_details_google(
-            request.item_name.strip(), 
-            request.seller.strip() if request.seller else None, 
-            request.model.strip() if request.model else None
-        )
-        
-        if not result_json:
-            print("❌ No result from scraping function")
-            raise HTTPException(
-                status_code=500,
-                detail="Scraping function returned empty result"
-            )
-        
-        # Parse results
-        try:
-            results = json.loads(result_json) if isinstance(result_json, str) else result_json
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON decode error: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail="Invalid JSON response from scraping function"
-            )
+        # Fan out to every registered source - Google Shopping ALWAYS returns data
+        query = SearchQuery(category, request.item_name, request.seller, request.model)
+        search, cache_state = await cached_search(query, MAKE_MODEL)
+        results, source_status = search["results"], search["sources"]
         
         if not results or len(results) == 0:
-            print("❌ Empty results array")
+            log.info("❌ Empty results array")
             raise HTTPException(
                 status_code=404,
                 detail="No products found for the given criteria"
             )
         
-        print(f"✅ Successfully found {len(results)} products")
+        log.debug(f"✅ Successfully found {len(results)} products", extra={"cache": cache_state})
         
         # Return successful response
         return {
@@ -130,10 +368,13 @@ def scrape_products(category: str, request: ItemRequest_form1):
                 "model": request.model
             },
             "total_results": len(results),
-            "results": results,
+            "results": results.to_dicts(),
+            "statistics": search["statistics"],
             "metadata": {
                 "scraped_at": "2025-07-30",
-                "source": "Enhanced Mock Data",
+                "source": describe_sources(source_status),
+                "sources": source_status,
+                "cache": cache_state,
                 "government_procurement_ready": True,
                 "api_version": "1.0.0"
             }
@@ -142,29 +383,32 @@ def scrape_products(category: str, request: ItemRequest_form1):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"💥 Unexpected error: {e}")
-        print(f"💥 Error type: {type(e)}")
+        log.exception(f"💥 Unexpected error: {e}")
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
 @app.post("/scrape-specs/{category}")
-def scrape_products_specs(category: str, request: ItemRequest_form2):
+async def scrape_products_specs(category: str, request: ItemRequest_form2):
     """
     Scrape products by specifications - Enhanced to return mock data
     """
+    payload = await search_specs(category, request)
+    with stage("serialize"):
+        return ORJSONResponse(payload)
+
+async def search_specs(category, request):
+    """Specification search returning the response payload"""
     try:
-        print(f"🔍 SPECIFICATION SEARCH REQUEST")
-        print(f"📋 Category: {category}")
-        print(f"📋 Item: {request.item_name}")
-        print(f"📋 Specifications: {request.specifications}")
-        print(f"================================")
+        log.info("🔍 Specification search", extra={
+            "category": category, "item": request.item_name, "specifications": request.specifications
+        })
         
         # Validate category
         valid_categories = ["electronics", "medical", "construction"]
         if category not in valid_categories:
-            print(f"❌ Invalid category: {category}")
+            log.info(f"❌ Invalid category: {category}")
             raise HTTPException(
                 status_code=400, 
                 detail=f"Invalid category '{category}'. Valid categories: {valid_categories}"
@@ -172,21 +416,37 @@ def scrape_products_specs(category: str, request: ItemRequest_form2):
 
         # Validate input
         if not request.item_name or request.item_name.strip() == "":
-            print("❌ Empty item name")
+            log.info("❌ Empty item name")
             raise HTTPException(
                 status_code=400,
                 detail="Item name is required and cannot be empty"
             )
 
-        # Generate specification-based mock data
-        print(f"📝 Generating specification-based products...")
-        spec_products = generate_specification_based_products(
-            request.item_name.strip(),
-            request.specifications,
-            category
-        )
+        # Answer from the local spec index when it has enough matches
+        query = SearchQuery(category, request.item_name, specifications=request.specifications)
+        spec_products = index_answer(query)
+        if spec_products is not None:
+            log.debug("⚡ Answered from the spec index")
+            with stage("normalize"):
+                statistics = annotate_batch(spec_products)
+            source, source_status, cache_state = "Local Spec Index", {}, "index"
+        else:
+            # Query the specification sources, falling back to generated data
+            search, cache_state = await cached_search(query, SPECS)
+            spec_products, source_status, statistics = search["results"], search["sources"], search["statistics"]
+            source = describe_sources(source_status)
+        
+        if not spec_products:
+            log.debug("📝 Generating specification-based products...")
+            spec_products = generate_specification_based_products(
+                request.item_name.strip(),
+                request.specifications,
+                category
+            )
+            statistics = annotate_batch(spec_products)
+            source = "Specification-based Mock Data"
         
-        print(f"✅ Generated {len(spec_products)} specification-based products")
+        log.debug(f"✅ Found {len(spec_products)} specification-based products", extra={"cache": cache_state})
         
         return {
             "status": "success",
@@ -197,10 +457,13 @@ def scrape_products_specs(category: str, request: ItemRequest_form2):
                 "specifications": request.specifications
             },
             "total_results": len(spec_products),
-            "results": spec_products,
+            "results": spec_products.to_dicts(),
+            "statistics": statistics,
             "metadata": {
                 "scraped_at": "2025-07-30",
-                "source": "Specification-based Mock Data",
+                "source": source,
+                "sources": source_status,
+                "cache": cache_state,
                 "government_procurement_ready": True,
                 "search_type": "specifications"
             }
@@ -209,16 +472,25 @@ def scrape_products_specs(category: str, request: ItemRequest_form2):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"💥 Unexpected error: {e}")
+        log.exception(f"💥 Unexpected error: {e}")
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
         )
 
+def index_answer(query):
+    """Spec-index matches in the query's category, or None when too few to skip the scrape"""
+    products = spec_index.search(query.item_name, query.specifications, query.category)
+    return products if len(products) >= MIN_MATCHES else None
+
+def describe_sources(source_status):
+    """Human readable list of the sources that contributed results"""
+    return ", ".join(
+        report["source"] for report in source_status.values() if report["status"] == "ok"
+    ) or "No sources responded"
+
 def generate_specification_based_products(item_name, specifications, category):
     """Generate products based on specifications"""
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
     # Build specification string
     spec_string = ""
     if specifications:
@@ -228,68 +500,34 @@ def generate_specification_based_products(item_name, specifications, category):
                 spec_parts.append(f"{spec['specification_name']}: {spec['value']}")
         spec_string = ", ".join(spec_parts)
     
-    # Category-specific price ranges
-    price_ranges = {
-        "construction": {
-            "steel": (45000, 85000),
-            "cement": (350, 450),
-            "brick": (8, 15),
-            "paint": (200, 500),
-            "default": (1000, 50000)
-        },
-        "electronics": {
-            "laptop": (35000, 85000),
-            "mobile": (15000, 50000),
-            "default": (5000, 60000)
-        },
-        "medical": {
-            "equipment": (25000, 200000),
-            "default": (10000, 100000)
-        }
-    }
-    
-    # Determine price range
-    item_lower = item_name.lower()
-    category_prices = price_ranges.get(category, {"default": (5000, 50000)})
-    price_min, price_max = category_prices.get("default", (5000, 50000))
+    # Category-specific price range and brands from the taxonomy
+    classified = get_taxonomy().classify(item_name, category)
+    price_min, price_max = classified.price_range
     
-    for key, (min_p, max_p) in category_prices.items():
-        if key in item_lower:
-            price_min, price_max = min_p, max_p
-            break
-    
-    products = []
+    products = ProductBatch()
     
     # Generate specification-matching products
-    brands = {
-        "construction": ["Tata Steel", "SAIL", "JSW Steel", "ACC", "UltraTech"],
-        "electronics": ["HP", "Dell", "Samsung", "Apple", "Sony"],
-        "medical": ["Philips", "GE Healthcare", "Siemens", "Medtronic"]
-    }
-    
-    category_brands = brands.get(category, ["QualityBrand", "PremiumTech"])
-    
-    for i, brand in enumerate(category_brands[:5]):
-        products.append({
-            "Product Name": f"{brand} {item_name} - Spec Match {i+1}",
-            "Seller": brand,
-            "Price": f"₹{random.randint(price_min, price_max):,}",
-            "Rating": f"{random.uniform(4.0, 4.8):.1f} stars",
-            "Reviews": f"{random.randint(50, 250)} reviews",
-            "Specifications": spec_string or f"High-quality {item_name} with standard specifications",
-            "Website": f"https://{brand.lower().replace(' ', '')}.com",
-            "Last Updated": current_time
-        })
+    for i, brand in enumerate(classified.brands[:5]):
+        products.append(ProductRecord(
+            name=f"{brand} {item_name} - Spec Match {i+1}",
+            seller=brand,
+            price_paise=random.randint(price_min, price_max) * 100,
+            rating=round(random.uniform(4.0, 4.8), 1),
+            review_count=random.randint(50, 250),
+            specifications=spec_string or f"High-quality {item_name} with standard specifications",
+            website=f"https://{brand.lower().replace(' ', '')}.com",
+            source="Specification-based Mock Data",
+            synthetic=True
+        ))
     
     return products
 
 @app.get("/test-search")
-def test_search():
+async def test_search():
     """Test endpoint with guaranteed results"""
     try:
-        print("🧪 Running test search...")
-        sample_result = scrape_product_details_google("Laptop", "HP", "i5")
-        results = json.loads(sample_result) if sample_result else []
+        log.info("🧪 Running test search...")
+        results = scrape_product_details_google("Laptop", "HP", "i5").to_dicts()
         
         return {
             "status": "success",
@@ -307,17 +545,356 @@ def test_search():
             "message": f"Test failed: {str(e)}",
             "error_details": str(e)
         }
+@app.get("/price-history")
+async def price_history(
+    item_name: str,
+    seller: Optional[str] = None,
+    source: Optional[str] = None,
+    days: int = Query(DEFAULT_DAYS, ge=1, le=365)
+):
+    """
+    Daily min/median/max of the prices observed for an item across past scrapes
+    """
+    history = get_history()
+    if history is None:
+        raise HTTPException(status_code=503, detail="Price history is disabled")
+    if not item_name.strip():
+        raise HTTPException(status_code=400, detail="Item name is required and cannot be empty")
+
+    points = await asyncio.to_thread(history.daily, item_name, seller, source, days)
+    return ORJSONResponse({
+        "status": "success",
+        "search_criteria": {
+            "item_name": item_name,
+            "seller": seller,
+            "source": source,
+            "days": days
+        },
+        "total_days": len(points),
+        "history": points
+    })
+
+@app.post("/predict-price")
+async def predict_price(request: PricePredictionRequest):
+    """
+    Estimate prices for one or more items with the offline-trained model
+    """
+    estimator = get_estimator()
+    if estimator is None:
+        raise HTTPException(
+            status_code=503,
+            detail="No price model has been trained yet; run `python estimator.py`"
+        )
+    if not request.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BATCH_ITEMS} items can be priced at once, got {len(request.items)}"
+        )
+
+    documents = [
+        (
+            " ".join(filter(None, [
+                item.item_name,
+                item.model,
+                *(spec.get("value") for spec in item.specifications or [])
+            ])),
+            item.seller
+        )
+        for item in request.items
+    ]
+    # One matrix product prices the whole batch
+    estimates, lows, highs = estimator.predict_ranges(documents)
+
+    return ORJSONResponse({
+        "status": "success",
+        "total_results": len(documents),
+        "predictions": [
+            {
+                "item_name": item.item_name,
+                "estimated_price": round(float(estimate), 2),
+                "price_range": [round(float(low), 2), round(float(high), 2)]
+            }
+            for item, estimate, low, high in zip(request.items, estimates, lows, highs)
+        ],
+        "model": estimator.describe()
+    })
+
+@app.post("/benchmark/batch")
+async def benchmark_batch(request: BatchRequest, stream_format: str = Query(NDJSON, alias="format")):
+    """
+    Price a whole tender BOQ in one request, streaming each item as it completes
+    """
+    validate_stream_format(stream_format)
+    if not request.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {MAX_BATCH_ITEMS} items, got {len(request.items)}"
+        )
+
+    log.info(f"📦 Batch benchmark request: {len(request.items)} items")
+
+    async def price_item(item):
+        # Items go through the same cached, coalesced search path as the single endpoints
+        if item.specifications:
+            return await search_specs(
+                item.category, ItemRequest_form2(item_name=item.item_name, specifications=item.specifications)
+            )
+        return await search_make_model(
+            item.category, ItemRequest_form1(item_name=item.item_name, seller=item.seller, model=item.model)
+        )
+
+    async def events():
+        started = time.perf_counter()
+        failed = 0
+        async for index, result, error in run_bounded(request.items, price_item):
+            if error is None:
+                yield "item", {"index": index, **result}
+                continue
+            failed += 1
+            yield "item", {
+                "index": index,
+                "status": "error",
+                "status_code": getattr(error, "status_code", 500),
+                "detail": getattr(error, "detail", str(error)),
+                "item_name": request.items[index].item_name
+            }
+        yield "summary", {
+            "status": "complete",
+            "total_items": len(request.items),
+            "succeeded": len(request.items) - failed,
+            "failed": failed,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    return event_stream_response(events(), stream_format)
+
+VALID_CATEGORIES = ["electronics", "medical", "construction"]
+VALID_SERVICE_TYPES = ["medical", "electrical", "civil"]
+
+def validate_stream_format(stream_format):
+    if stream_format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format '{stream_format}'. Valid formats: {list(STREAM_FORMATS)}"
+        )
+
+def validate_search_request(category, item_name):
+    if category not in VALID_CATEGORIES:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid category '{category}'. Valid categories: {VALID_CATEGORIES}"
+        )
+    if not item_name or item_name.strip() == "":
+        raise HTTPException(
+            status_code=400,
+            detail="Item name is required and cannot be empty"
+        )
+
+def score_summary(rows):
+    """Per-product scores for the closing summary event, keyed by stream index"""
+    return [
+        {
+            "index": index,
+            "reasonability_score": row.get("reasonability_score"),
+            "price_outlier": row.get("price_outlier", False)
+        }
+        for index, row in enumerate(rows)
+    ]
+
+def product_event(index, row):
+    """One streamed product: its position in the final results, the source that listed it, the API row"""
+    return {"index": index, "source": row["Source"], "product": row}
+
+def streaming_loader(key, query, kind, events):
+    """
+    Coalesced scrape that also reports its progress, for stream_search.
+
+    Runs the fan-out as sources finish, putting ("product", payload) and
+    ("source", payload) onto `events`, and caches the complete result set
+    itself so it lands even if the client has gone. Product rows are scored
+    against the products found so far; the final scores are in the value.
+    """
+    async def scrape():
+        collector = ResultCollector()
+        results = ProductBatch()
+        source_status = {}
+        async for source, source_results, report in aggregate_iter(query, kind):
+            source_status[source.name] = report
+            first = len(results)
+            for product in source_results:
+                if collector.add(product):
+                    results.append(product)
+            if len(results) > first:
+                annotate_batch(results)
+                for index, row in enumerate(results.to_dicts()[first:], first):
+                    events.put_nowait(("product", product_event(index, row)))
+            events.put_nowait(("source", {"name": source.name, **report}))
+
+        spec_index.add_batch(results, query.category)
+        with stage("normalize"):
+            statistics = annotate_batch(results)
+        value = {"results": results, "sources": source_status, "statistics": statistics}
+        if has_results(value):
+            await result_cache.store(key, value)
+        return value
+
+    async def load():
+        return await inflight_searches.do(key, scrape)
+
+    return load
+
+async def stream_search(query, kind, fallback=None):
+    """
+    Yield a product event as soon as a source returns it, then a summary.
+
+    A specification search the spec index can answer, or a fresh cache
+    entry, is replayed immediately. Otherwise the search joins the
+    coalesced scrape for its key: when this request started it, products
+    are emitted per source as they finish (deduplicated across sources);
+    when it joined one already running, they are replayed once it ends.
+    Product events have the same fields on every path. `fallback`
+    produces results when no source found any.
+    """
+    started = time.perf_counter()
+    key = make_cache_key(kind, query.category, query.item_name, query.seller, query.model, query.specifications)
+    prewarmer.track(key, query, kind)
+
+    indexed = index_answer(query) if kind == SPECS else None
+    cached = await result_cache.get_fresh(key) if indexed is None else None
+    if indexed is not None:
+        results, source_status, cache_state = indexed, {}, "index"
+        statistics = annotate_batch(results)
+        rows = results.to_dicts()
+        for index, row in enumerate(rows):
+            yield "product", product_event(index, row)
+    elif cached is not None:
+        results, source_status, statistics, cache_state = (
+            cached["results"], cached["sources"], cached["statistics"], "hit"
+        )
+        rows = results.to_dicts()
+        for index, row in enumerate(rows):
+            yield "product", product_event(index, row)
+    else:
+        events = asyncio.Queue()
+        search = asyncio.ensure_future(streaming_loader(key, query, kind, events)())
+        streamed = 0
+        try:
+            while not search.done():
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait({getter, search}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+                event, payload = getter.result()
+                streamed += event == "product"
+                yield event, payload
+            while not events.empty():
+                event, payload = events.get_nowait()
+                streamed += event == "product"
+                yield event, payload
+            value = await search
+        finally:
+            # A client that goes away stops waiting; the shielded scrape still finishes and caches
+            search.cancel()
+
+        results, source_status, statistics = value["results"], value["sources"], value["statistics"]
+        cache_state = "miss"
+        rows = results.to_dicts()
+        if results and not streamed:
+            # Joined a scrape another request started, so none of its products were seen here
+            for index, row in enumerate(rows):
+                yield "product", product_event(index, row)
+        elif not results and fallback is not None:
+            results = fallback()
+            statistics = annotate_batch(results)
+            rows = results.to_dicts()
+            for index, row in enumerate(rows):
+                yield "product", product_event(index, row)
+
+    yield "summary", {
+        "status": "success" if results else "empty",
+        "total_results": len(results),
+        "statistics": statistics,
+        "scores": score_summary(rows),
+        "sources": source_status,
+        "cache": cache_state,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+@app.post("/scrape-make-model/{category}/stream")
+async def stream_products(category: str, request: ItemRequest_form1, stream_format: str = Query(NDJSON, alias="format")):
+    """
+    Streaming variant of /scrape-make-model: products are sent as each source returns them
+    """
+    validate_stream_format(stream_format)
+    validate_search_request(category, request.item_name)
+    query = SearchQuery(category, request.item_name, request.seller, request.model)
+    return event_stream_response(stream_search(query, MAKE_MODEL), stream_format)
+
+@app.post("/scrape-specs/{category}/stream")
+async def stream_products_specs(category: str, request: ItemRequest_form2, stream_format: str = Query(NDJSON, alias="format")):
+    """
+    Streaming variant of /scrape-specs, falling back to generated products
+    """
+    validate_stream_format(stream_format)
+    validate_search_request(category, request.item_name)
+    query = SearchQuery(category, request.item_name, specifications=request.specifications)
+
+    def fallback():
+        return generate_specification_based_products(request.item_name.strip(), request.specifications, category)
+
+    return event_stream_response(stream_search(query, SPECS, fallback), stream_format)
+
+@app.post("/scrape-service-providers/{service_type}/stream")
+async def stream_service_providers(service_type: str, request: dict, stream_format: str = Query(NDJSON, alias="format")):
+    """
+    Streaming variant of /scrape-service-providers
+    """
+    validate_stream_format(stream_format)
+    if service_type not in VALID_SERVICE_TYPES:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid service type '{service_type}'. Valid types: {VALID_SERVICE_TYPES}"
+        )
+
+    async def events():
+        started = time.perf_counter()
+        providers, _, _ = await find_service_providers(
+            service_type, request.get('location'), request.get('services', [])
+        )
+        providers = [dict(provider) for provider in providers]
+        for index, provider in enumerate(providers):
+            yield "product", {"index": index, "product": provider}
+        statistics = annotate_results(providers, price_key=None, rating_key="rating", reviews_key="reviews")
+        yield "summary", {
+            "status": "success" if providers else "empty",
+            "total_results": len(providers),
+            "statistics": statistics,
+            "scores": score_summary(providers),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    return event_stream_response(events(), stream_format)
+
 @app.post("/scrape-service-providers/{service_type}")
-def scrape_service_providers(service_type: str, request: dict):
+async def scrape_service_providers(service_type: str, request: dict):
     """
     Search for service providers by type and location
     """
+    payload = await search_service_providers(service_type, request)
+    with stage("serialize"):
+        return ORJSONResponse(payload)
+
+async def search_service_providers(service_type, request):
+    """Service provider search returning the response payload"""
     try:
-        print(f"🔍 SERVICE PROVIDER SEARCH REQUEST")
-        print(f"📋 Service Type: {service_type}")
-        print(f"📋 Location: {request.get('location')}")
-        print(f"📋 Services: {request.get('services')}")
-        print(f"================================")
+        log.info("🔍 Service provider search", extra={
+            "service_type": service_type, "location": request.get("location"), "services": request.get("services")
+        })
         
         # Validate service type
         valid_service_types = ["medical", "electrical", "civil"]
@@ -327,14 +904,18 @@ def scrape_service_providers(service_type: str, request: dict):
                 detail=f"Invalid service type '{service_type}'. Valid types: {valid_service_types}"
             )
 
-        # Generate service provider mock data
-        providers = generate_service_provider_data(
-            service_type, 
-            request.get('location'), 
+        # Live listings, cached per location bucket; generated data if none could be fetched
+        providers, source, search_metadata = await find_service_providers(
+            service_type,
+            request.get('location'),
             request.get('services', [])
         )
+
+        # Copies, so scoring never writes into cached listings
+        providers = [dict(provider) for provider in providers]
+        statistics = annotate_results(providers, price_key=None, rating_key="rating", reviews_key="reviews")
         
-        print(f"✅ Generated {len(providers)} service providers")
+        log.debug(f"✅ Found {len(providers)} service providers", extra={"source": source})
         
         return {
             "status": "success",
@@ -346,9 +927,11 @@ def scrape_service_providers(service_type: str, request: dict):
             },
             "total_results": len(providers),
             "results": providers,
+            "statistics": statistics,
             "metadata": {
                 "scraped_at": "2025-07-30",
-                "source": "Service Provider Mock Data",
+                "source": source,
+                **search_metadata,
                 "government_procurement_ready": True
             }
         }
@@ -356,7 +939,7 @@ def scrape_service_providers(service_type: str, request: dict):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"💥 Unexpected error: {e}")
+        log.exception(f"💥 Unexpected error: {e}")
         raise HTTPException(
             status_code=500, 
             detail=f"Internal server error: {str(e)}"
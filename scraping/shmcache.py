@@ -0,0 +1,176 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+import orjson
+
+# Mapped file size and the fixed slot each entry occupies
+SHARED_CACHE_MB = int(os.environ.get("SCRAPE_SHARED_CACHE_MB", 64))
+SLOT_KB = int(os.environ.get("SCRAPE_SHARED_CACHE_SLOT_KB", 32))
+# Slots per set; a key can only live in the WAYS slots of its set
+WAYS = 8
+COMPRESSION_LEVEL = 1
+
+# key digest, stored_at, last_used, payload length
+_HEADER = struct.Struct("<16sddI")
+_EMPTY = bytes(16)
+
+
+class SharedMemoryTier:
+    """
+    Cross-process cache tier in one mmap'd file, typically under /dev/shm.
+
+    The file is a set-associative table: a key hashes to one set of WAYS
+    fixed-size slots and replaces the least recently used slot of that set.
+    Each set is guarded by an fcntl byte-range lock on its region (plus a
+    thread lock, since fcntl locks are per process), so worker processes
+    forked from one master read and write it concurrently. Values are
+    stored as zlib-compressed JSON; entries larger than a slot are skipped.
+    Same get/stored_at/set/purge/close interface as the SQLite tier; open
+    it through `open_tier` so a process holds one mapping per file.
+    """
+
+    def __init__(self, path, size_mb=SHARED_CACHE_MB, slot_kb=SLOT_KB, ways=WAYS):
+        self.path = path
+        self.slot_size = slot_kb * 1024
+        self.ways = ways
+        self.sets = max(1, (size_mb * 1024 * 1024) // (self.slot_size * ways))
+        size = self.sets * ways * self.slot_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        self._thread_lock = threading.Lock()
+        self._users = 0
+        self.counters = {"oversize": 0, "evictions": 0}
+
+    def _locate(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return digest, int.from_bytes(digest[:8], "little") % self.sets
+
+    def _locked(self, index):
+        return _SetLock(self, index)
+
+    def _slot(self, index, way):
+        return (index * self.ways + way) * self.slot_size
+
+    def get(self, key):
+        digest, index = self._locate(key)
+        with self._locked(index):
+            for way in range(self.ways):
+                offset = self._slot(index, way)
+                stored_digest, stored_at, _, length = _HEADER.unpack_from(self._map, offset)
+                if stored_digest == digest:
+                    start = offset + _HEADER.size
+                    payload = self._map[start:start + length]
+                    # Recency is what the set's replacement policy goes by
+                    _HEADER.pack_into(self._map, offset, stored_digest, stored_at, time.time(), length)
+                    break
+            else:
+                return None
+        return orjson.loads(zlib.decompress(payload)), stored_at
+
+    def stored_at(self, key):
+        """When the entry was stored, or None; leaves its recency and payload alone"""
+        digest, index = self._locate(key)
+        with self._locked(index):
+            for way in range(self.ways):
+                stored_digest, stored_at, _, _ = _HEADER.unpack_from(self._map, self._slot(index, way))
+                if stored_digest == digest:
+                    return stored_at
+        return None
+
+    def set(self, key, value, stored_at):
+        payload = zlib.compress(orjson.dumps(value), COMPRESSION_LEVEL)
+        if _HEADER.size + len(payload) > self.slot_size:
+            self.counters["oversize"] += 1
+            return
+        digest, index = self._locate(key)
+        with self._locked(index):
+            victim, oldest = None, None
+            for way in range(self.ways):
+                offset = self._slot(index, way)
+                stored_digest, _, last_used, _ = _HEADER.unpack_from(self._map, offset)
+                if stored_digest == digest or stored_digest == _EMPTY:
+                    victim = offset
+                    break
+                if oldest is None or last_used < oldest:
+                    victim, oldest = offset, last_used
+            else:
+                self.counters["evictions"] += 1
+            start = victim + _HEADER.size
+            self._map[start:start + len(payload)] = payload
+            _HEADER.pack_into(self._map, victim, digest, stored_at, time.time(), len(payload))
+
+    def purge(self, older_than):
+        for index in range(self.sets):
+            with self._locked(index):
+                for way in range(self.ways):
+                    offset = self._slot(index, way)
+                    stored_digest, stored_at, _, _ = _HEADER.unpack_from(self._map, offset)
+                    if stored_digest != _EMPTY and stored_at < older_than:
+                        _HEADER.pack_into(self._map, offset, _EMPTY, 0.0, 0.0, 0)
+
+    def stats(self):
+        return {**self.counters, "sets": self.sets, "ways": self.ways, "slot_bytes": self.slot_size}
+
+    def close(self):
+        with _tiers_lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+            _tiers.pop(self.path, None)
+        with self._thread_lock:
+            self._map.close()
+            # Closing any descriptor of the file drops this process's locks on it
+            os.close(self._fd)
+
+
+class _SetLock:
+    """Thread lock plus an exclusive fcntl lock on one set's byte range of the file"""
+
+    __slots__ = ("tier", "start", "length")
+
+    def __init__(self, tier, index):
+        self.tier = tier
+        self.length = tier.ways * tier.slot_size
+        self.start = index * self.length
+
+    def __enter__(self):
+        self.tier._thread_lock.acquire()
+        try:
+            fcntl.lockf(self.tier._fd, fcntl.LOCK_EX, self.length, self.start)
+        except BaseException:
+            self.tier._thread_lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.lockf(self.tier._fd, fcntl.LOCK_UN, self.length, self.start)
+        finally:
+            self.tier._thread_lock.release()
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+def open_tier(path):
+    """The process's mapping of `path`, shared by every cache using it"""
+    with _tiers_lock:
+        tier = _tiers.get(path)
+        if tier is None:
+            tier = _tiers[path] = SharedMemoryTier(path)
+        tier._users += 1
+        return tier
+
+
+def default_path(name="scraper-cache"):
+    """A RAM-backed location for the mapped file where the OS has one"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else os.environ.get("TMPDIR", "/tmp")
+    return os.path.join(directory, f"{name}-{os.getpid()}")
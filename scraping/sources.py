@@ -0,0 +1,142 @@
+import os
+from urllib.parse import urlencode
+
+from engine import get_engine
+from google import scrape_product_details_google, scrape_product_details_google_rendered
+from google_specs import scrape_product_details_google_specs_async
+from test import scrape_product_details_builder_mart_async
+from records import ProductRecord, ProductBatch
+from logs import get_logger
+
+# Search endpoint of the Express backend listing local retailer products
+RETAILER_API_URL = os.environ.get("RETAILER_API_URL", "http://localhost:3000/api/product/search")
+# Paged listing of every retailer product, mirrored into the spec index
+RETAILER_CATALOG_URL = os.environ.get("RETAILER_CATALOG_URL", "http://localhost:3000/api/product/catalog")
+CATALOG_PAGE_SIZE = 500
+# Source name of every retailer product; the catalog sync replaces exactly these in the spec index
+RETAILER_SOURCE = "Local Retailer Listings"
+CATALOG_SYNC_INTERVAL = float(os.environ.get("RETAILER_SYNC_INTERVAL", 300))
+# Render Google Shopping in the headless browser pool instead of only generating estimates
+BROWSER_SOURCES = os.environ.get("BROWSER_SOURCES", "").lower() in ("1", "true", "yes")
+
+log = get_logger("sources")
+
+MAKE_MODEL = "make_model"
+SPECS = "specs"
+
+
+class SearchQuery:
+    """Normalized search criteria handed to every source"""
+
+    __slots__ = ("category", "item_name", "seller", "model", "specifications")
+
+    def __init__(self, category, item_name, seller=None, model=None, specifications=None):
+        self.category = category
+        self.item_name = item_name.strip()
+        self.seller = seller.strip() if seller else None
+        self.model = model.strip() if model else None
+        self.specifications = specifications or None
+
+    def spec_terms(self):
+        return " ".join(spec["value"] for spec in self.specifications or [] if spec.get("value"))
+
+
+class Source:
+    """A registered search backend with its own deadline"""
+
+    __slots__ = ("name", "label", "search", "deadline", "kinds", "categories")
+
+    def __init__(self, name, label, search, deadline, kinds, categories=None):
+        self.name = name
+        self.label = label
+        self.search = search
+        self.deadline = deadline
+        self.kinds = kinds
+        self.categories = categories
+
+    def applies_to(self, kind, category):
+        if kind not in self.kinds:
+            return False
+        return self.categories is None or category in self.categories
+
+
+SOURCES = {}
+
+
+def register_source(name, label, deadline, kinds, categories=None):
+    """Decorator registering an async `search(query)` function as a source"""
+    def decorator(search):
+        SOURCES[name] = Source(name, label, search, deadline, tuple(kinds), categories)
+        return search
+    return decorator
+
+
+def sources_for(kind, category):
+    return [source for source in SOURCES.values() if source.applies_to(kind, category)]
+
+
+@register_source("google_shopping", "Google Shopping", deadline=10.0 if BROWSER_SOURCES else 2.0, kinds=(MAKE_MODEL,))
+async def search_google_shopping(query):
+    if BROWSER_SOURCES:
+        try:
+            rendered = await scrape_product_details_google_rendered(query.item_name, query.seller, query.model)
+            if rendered:
+                return rendered
+        except Exception as e:
+            log.warning(f"⚠️ Rendered Google Shopping search failed, using generated data: {e}")
+    return scrape_product_details_google(query.item_name, query.seller, query.model)
+
+
+@register_source("buildersmart", "BuildersMart", deadline=5.0, kinds=(MAKE_MODEL,),
+                 categories=("construction",))
+async def search_builders_mart(query):
+    return await scrape_product_details_builder_mart_async(query.item_name, query.seller, query.model)
+
+
+@register_source("google_specs", "Google Shopping Specification Search", deadline=5.0, kinds=(SPECS,))
+async def search_google_specs(query):
+    # None means the page could not be fetched or parsed
+    return await scrape_product_details_google_specs_async(query.item_name, query.specifications) or []
+
+
+@register_source("local_retailers", "Local Retailer Listings", deadline=2.0, kinds=(MAKE_MODEL, SPECS))
+async def search_local_retailers(query):
+    terms = " ".join(filter(None, [query.item_name, query.seller, query.model, query.spec_terms()]))
+    response = await get_engine().fetch(f"{RETAILER_API_URL}?{urlencode({'q': terms})}", source="local_retailers", cache=False)
+    if response.status_code != 200:
+        return []
+
+    return ProductBatch(retailer_record(product) for product in response.json().get("products", []))
+
+
+def retailer_record(product):
+    """ProductRecord for one product document from the Express backend"""
+    shop = product.get("shopId") or {}
+    price = product.get("discountPrice")
+    return ProductRecord(
+        name=product.get("name"),
+        seller=shop.get("name") if isinstance(shop, dict) else "Local Retailer",
+        price_paise=int(round(price * 100)) if price is not None else None,
+        specifications=" ".join(filter(None, [product.get("description"), product.get("tags")])) or None,
+        website="Local Retailer",
+        source=RETAILER_SOURCE
+    )
+
+
+async def fetch_retailer_catalog(page_size=CATALOG_PAGE_SIZE):
+    """Every retailer product, fetched page by page, as {lower-case category: ProductBatch}"""
+    catalog = {}
+    skip = 0
+    while True:
+        response = await get_engine().fetch(
+            f"{RETAILER_CATALOG_URL}?{urlencode({'skip': skip, 'limit': page_size})}", source="local_retailers", cache=False
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"catalog request failed with status {response.status_code}")
+        products = response.json().get("products", [])
+        for product in products:
+            category = str(product.get("category") or "").lower()
+            catalog.setdefault(category, ProductBatch()).append(retailer_record(product))
+        if len(products) < page_size:
+            return catalog
+        skip += page_size
@@ -0,0 +1,225 @@
+import heapq
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from operator import itemgetter
+
+from collector import dedupe_key
+from records import ProductBatch
+
+# Products kept in the index; the least recently added are evicted first
+MAX_DOCUMENTS = 50_000
+# Matches needed before an index answer replaces a remote scrape
+MIN_MATCHES = 3
+
+_TERM = re.compile(r"(\d+(?:\.\d+)?)\s*([a-z\"']+)?|([a-z][a-z0-9]*)")
+
+# Spelled-out and abbreviated units folded onto one canonical suffix
+UNITS = {
+    "gb": "gb", "gig": "gb", "gigs": "gb", "gigabyte": "gb", "gigabytes": "gb",
+    "tb": "tb", "terabyte": "tb", "terabytes": "tb",
+    "mb": "mb", "megabyte": "mb", "megabytes": "mb",
+    "kg": "kg", "kgs": "kg", "kilo": "kg", "kilos": "kg", "kilogram": "kg", "kilograms": "kg",
+    "g": "g", "gm": "g", "gms": "g", "gram": "g", "grams": "g",
+    "mm": "mm", "millimeter": "mm", "millimeters": "mm", "millimetre": "mm", "millimetres": "mm",
+    "cm": "cm", "centimeter": "cm", "centimeters": "cm", "centimetre": "cm", "centimetres": "cm",
+    "m": "m", "meter": "m", "meters": "m", "metre": "m", "metres": "m",
+    "in": "in", "inch": "in", "inches": "in", "\"": "in", "''": "in",
+    "ft": "ft", "feet": "ft", "foot": "ft", "'": "ft",
+    "w": "w", "watt": "w", "watts": "w",
+    "kw": "kw", "kilowatt": "kw", "kilowatts": "kw",
+    "v": "v", "volt": "v", "volts": "v",
+    "mah": "mah",
+    "hz": "hz", "hertz": "hz", "ghz": "ghz", "gigahertz": "ghz", "mhz": "mhz", "megahertz": "mhz",
+    "l": "l", "ltr": "l", "litre": "l", "litres": "l", "liter": "l", "liters": "l",
+    "ml": "ml", "millilitre": "ml", "millilitres": "ml", "milliliter": "ml", "milliliters": "ml",
+    "mp": "mp", "megapixel": "mp", "megapixels": "mp",
+    "ton": "ton", "tons": "ton", "tonne": "ton", "tonnes": "ton",
+    "mpa": "mpa", "grade": "grade",
+}
+
+
+def terms(text):
+    """
+    Tokenize into lower-case words and unit-normalized quantities.
+
+    "16 GB", "16GB" and "16 gigabytes" all become "16gb"; a number followed
+    by a word that is not a unit stays as two terms.
+    """
+    found = []
+    for number, unit, word in _TERM.findall(str(text or "").lower()):
+        if word:
+            found.append(word)
+            continue
+        if number.endswith(".0"):
+            number = number[:-2]
+        canonical = UNITS.get(unit)
+        if canonical:
+            found.append(number + canonical)
+        else:
+            found.append(number)
+            if unit:
+                found.append(unit.strip("\"'"))
+    return found
+
+
+def spec_terms(specifications):
+    """Terms every matching product must contain, from the request's spec values"""
+    return {term for spec in specifications or [] for term in terms(spec.get("value"))}
+
+
+def record_terms(record):
+    return set(terms(record.name)) | set(terms(record.specifications))
+
+
+def category_term(category):
+    """Pseudo-term confining a search to one category; `terms` never yields an "="."""
+    return f"category={str(category or '').lower()}"
+
+
+def matches_specs(record, required):
+    return not required or required <= record_terms(record)
+
+
+class SpecIndex:
+    """
+    In-memory inverted index from normalized terms to products.
+
+    Fed with scraped search results and the local retailer catalog, each
+    filed under the category it was found for; generated placeholder
+    records are never indexed. A spec query intersects the posting sets of
+    its required terms (smallest first) and ranks the survivors by the IDF
+    weight of the item-name terms they contain. With a `ttl`, products
+    older than that many seconds stop matching and are dropped, so an index
+    answer is never staler than the result cache would serve.
+    """
+
+    def __init__(self, max_documents=MAX_DOCUMENTS, ttl=None):
+        self.max_documents = max_documents
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._documents = OrderedDict()
+        self._postings = {}
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, record, scraped_at, category):
+        if record.synthetic:
+            return
+        key = (str(category or "").lower(), dedupe_key(record))
+        document_terms = record_terms(record)
+        document_terms.add(category_term(category))
+        with self._lock:
+            self._link(key, record, document_terms, scraped_at)
+            while len(self._documents) > self.max_documents:
+                self._unlink(next(iter(self._documents)))
+
+    def add_batch(self, batch, category):
+        for record in batch:
+            self.add(record, batch.scraped_at, category)
+
+    def replace_source(self, source, batches):
+        """
+        Make `batches` ({category: ProductBatch}) the only indexed products from `source`.
+
+        Products the source no longer lists are removed; returns how many.
+        """
+        current = {
+            (str(category or "").lower(), dedupe_key(record))
+            for category, batch in batches.items() for record in batch
+        }
+        with self._lock:
+            gone = [
+                key for key, (record, _, _) in self._documents.items()
+                if record.source == source and key not in current
+            ]
+            for key in gone:
+                self._unlink(key)
+        for category, batch in batches.items():
+            self.add_batch(batch, category)
+        return len(gone)
+
+    def _link(self, key, record, document_terms, scraped_at):
+        if key in self._documents:
+            self._unlink(key)
+        self._documents[key] = (record, document_terms, scraped_at)
+        for term in document_terms:
+            self._postings.setdefault(term, set()).add(key)
+
+    def _unlink(self, key):
+        _, document_terms, _ = self._documents.pop(key)
+        for term in document_terms:
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(key)
+                if not posting:
+                    del self._postings[term]
+
+    def _expire(self):
+        """Drop expired products from the old end; returns the oldest time still served"""
+        if self.ttl is None:
+            return None
+        oldest = time.time() - self.ttl
+        # Documents are kept in the order they were (re-)added, which is close to scrape order
+        while self._documents:
+            key = next(iter(self._documents))
+            if self._documents[key][2] >= oldest:
+                break
+            self._unlink(key)
+        return oldest
+
+    def search(self, item_name, specifications=None, category=None, limit=10):
+        """
+        Best-matching records containing every spec term and at least one item term.
+
+        Limited to `category` when given. Returned as a ProductBatch dated by
+        its oldest record.
+        """
+        required = spec_terms(specifications)
+        wanted = set(terms(item_name)) - required
+        if not required and not wanted:
+            return ProductBatch()
+        if category is not None:
+            required.add(category_term(category))
+        with self._lock:
+            oldest = self._expire()
+            total = len(self._documents) or 1
+            candidates = None
+            if required:
+                postings = sorted((self._postings.get(term, set()) for term in required), key=len)
+                candidates = postings[0]
+                for posting in postings[1:]:
+                    candidates = candidates & posting
+                    if not candidates:
+                        return ProductBatch()
+
+            # Score through posting intersections so the work stays in C set operations
+            scores = {} if wanted else dict.fromkeys(candidates, 0.0)
+            for term in wanted:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                weight = math.log(1 + total / len(posting))
+                for key in posting & candidates if required else posting:
+                    scores[key] = scores.get(key, 0.0) + weight
+
+            if oldest is not None:
+                # Re-added products can sit behind older ones; never serve those past the TTL either
+                scores = {key: score for key, score in scores.items() if self._documents[key][2] >= oldest}
+            best = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+            ranked = [self._documents[key] for key, _ in best]
+
+        if not ranked:
+            return ProductBatch()
+        return ProductBatch([record for record, _, _ in ranked], min(scraped_at for _, _, scraped_at in ranked))
+
+    def stats(self):
+        return {
+            "documents": len(self._documents),
+            "terms": len(self._postings),
+            "max_documents": self.max_documents,
+            "ttl": self.ttl,
+        }
@@ -0,0 +1,33 @@
+import orjson
+from fastapi.responses import StreamingResponse
+
+NDJSON = "ndjson"
+SSE = "sse"
+STREAM_FORMATS = (NDJSON, SSE)
+
+_MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    SSE: "text/event-stream",
+}
+
+
+def encode_event(event, payload, fmt):
+    """One stream frame: a JSON line for NDJSON or an event/data block for SSE"""
+    if fmt == SSE:
+        return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+    return orjson.dumps({"event": event, **payload}) + b"\n"
+
+
+def event_stream_response(events, fmt=NDJSON):
+    """Wrap an async iterator of (event, payload) pairs in a streaming response"""
+
+    async def body():
+        async for event, payload in events:
+            yield encode_event(event, payload, fmt)
+
+    return StreamingResponse(
+        body(),
+        media_type=_MEDIA_TYPES[fmt],
+        # Stop reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
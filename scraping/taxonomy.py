@@ -0,0 +1,129 @@
+import json
+import os
+import re
+
+# Keyword -> price range / brand taxonomy; growing the category list only needs an edit here
+TAXONOMY_PATH = os.environ.get(
+    "SCRAPER_TAXONOMY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.json")
+)
+# Scope used for generic product searches that carry no category
+PRODUCTS = "products"
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def words(text):
+    """Lower-case whole words, plural "s" folded: "laptops" finds "laptop", "machine" never finds "ac" """
+    return [
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in _WORD.findall(str(text or "").lower())
+    ]
+
+
+class Category:
+    """A classified item: the matched keyword, its price range and typical brands"""
+
+    __slots__ = ("keyword", "price_range", "brands")
+
+    def __init__(self, keyword, price_range, brands):
+        self.keyword = keyword
+        self.price_range = price_range
+        self.brands = brands
+
+
+class KeywordMatcher:
+    """
+    Word-level Aho-Corasick automaton over multi-word keywords.
+
+    `longest(text)` scans the query once, following failure links, and
+    returns the value of the longest keyword found on word boundaries
+    (leftmost on ties), in time linear in the number of words.
+    """
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        # (length in words, keyword, value) of the longest keyword ending at each state
+        self._best = [None]
+        for keyword, value in keywords.items():
+            key_words = words(keyword)
+            state = 0
+            for word in key_words:
+                following = self._goto[state].get(word)
+                if following is None:
+                    following = self._goto[state][word] = len(self._goto)
+                    self._goto.append({})
+                    self._best.append(None)
+                state = following
+            self._best[state] = (len(key_words), keyword, value)
+        self._fail = [0] * len(self._goto)
+        self._link()
+
+    def _link(self):
+        # Breadth-first, so a state's failure target is finished before its children
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for word, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                # A keyword ending here is always longer than any reached through the failure link
+                if self._best[child] is None:
+                    self._best[child] = self._best[self._fail[child]]
+                queue.append(child)
+
+    def longest(self, text):
+        """(keyword, value) of the longest keyword in `text`, or None"""
+        state = 0
+        found = None
+        for position, word in enumerate(words(text)):
+            while state and word not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(word, 0)
+            best = self._best[state]
+            if best is not None:
+                length = best[0]
+                start = position - length + 1
+                if found is None or length > found[0] or (length == found[0] and start < found[1]):
+                    found = (length, start, best[1], best[2])
+        return None if found is None else (found[2], found[3])
+
+
+class Taxonomy:
+    """Per-scope keyword matchers with each scope's default range and brands"""
+
+    def __init__(self, data):
+        self.version = data.get("version", 1)
+        self.default = data["default"]
+        self.scopes = {
+            name: (scope["default"], KeywordMatcher(scope.get("terms", {})))
+            for name, scope in data["scopes"].items()
+        }
+
+    def classify(self, text, scope=PRODUCTS):
+        """Category of an item name within a scope (a procurement category or PRODUCTS)"""
+        default, matcher = self.scopes.get(scope, (self.default, None))
+        match = matcher.longest(text) if matcher is not None else None
+        keyword, entry = match if match is not None else (None, {})
+        return Category(
+            keyword,
+            tuple(entry.get("price_range") or default.get("price_range") or self.default["price_range"]),
+            tuple(entry.get("brands") or default.get("brands") or self.default["brands"]),
+        )
+
+
+_taxonomy = None
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    with open(path, encoding="utf-8") as f:
+        return Taxonomy(json.load(f))
+
+
+def get_taxonomy():
+    """Taxonomy compiled once per process"""
+    global _taxonomy
+    if _taxonomy is None:
+        _taxonomy = load_taxonomy()
+    return _taxonomy
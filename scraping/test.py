@@ -1,120 +1,204 @@
-from datetime import datetime
-import requests
-import json
+import asyncio
+import os
+import re
 import threading
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from engine import get_engine, get_sync_fetcher
+from httpcache import response_digest
+from collector import ResultCollector
+from extract import get_extractor
+from parse_pool import get_parse_pool
+from records import ProductRecord, ProductBatch
+from logs import get_logger
 
-def scrape_page(page_number, seller, model, base_url, result_list, lock):
-    url = f"{base_url}&p={page_number}"
-    response = requests.get(url, timeout=5)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    
-    # Scrape products from the page
-    products = soup.find_all('div', class_='item col-md-3 col-sm-4 col-xs-6')
-    
-    # Process the products and append to the result_list
+# Catalogue pages crawled at most per search, and how many are fetched at once
+MAX_PAGES = 20
+MAX_WORKERS = 4
+DEFAULT_MAX_RESULTS = 3
+PAGE_PARAM = re.compile(r"[?&]p=(\d+)")
+# Catalogue search endpoint; pointed at a local fixture server for benchmarks
+BUILDERSMART_URL = os.environ.get("BUILDERSMART_URL", "https://www.buildersmart.in/catalogsearch/result/")
+# Circuit breaker key in the fetch scheduler
+SOURCE_NAME = "buildersmart"
+
+log = get_logger("buildersmart")
+
+def matches_search(seller, model, product_seller, product_name):
+    # If model is defined, check both seller and model
+    if model:
+        return bool(seller and seller.lower() in product_seller.lower()) and model.lower() in product_name.lower()
+    # If model is not defined, check only the seller
+    if seller:
+        return seller.lower() in product_seller.lower()
+    return True
+
+def parse_page(content, seller, model, collector, digest=None):
+    """
+    Parse one catalogue page into the shared ResultCollector.
+
+    Returns the highest page number the pager links to, 0 on the last page
+    and MAX_PAGES when there is a next page but no numbered links.
+    """
+    products, page = get_extractor("buildersmart").extract(content, digest=digest)
+    return collect_page(products, page, seller, model, collector)
+
+def collect_page(products, page, seller, model, collector):
+    # Process the products and add them to the collector
     for product in products:
-        href = product.find('a')['href']
-        product_name = product.find('div', class_='product-name compareproductname').text.strip()
-        product_seller = product.find('div', class_='product-seller').text.strip().replace('by', '').strip()
-        price = product.find('span', class_='price', id='product-price-_listing_grid').text.strip()
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # If model is defined, check both seller and model
-        if model:
-            if (seller and seller.lower() in product_seller.lower()) and (model.lower() in product_name.lower()):
-                with lock:
-                    if not any(p['Product Name'] == product_name and p['Seller'] == product_seller for p in result_list):
-                        if len(result_list) < 3:
-                            result_list.append({
-                                "Product Name": product_name,
-                                "Seller": product_seller,
-                                "Price": price,
-                                "Rating":"No rating",
-                                "Reviews":"No Reviews",
-                                "specifications":"No specification",
-                                "Website": href,
-                                "last_updated":current_time
-                            })
-                        if len(result_list) >= 3:
-                            return
-        # If model is not defined, check only the seller
-        elif seller:
-            if seller.lower() in product_seller.lower():
-                with lock:
-                    if not any(p['Product Name'] == product_name and p['Seller'] == product_seller for p in result_list):
-                        if len(result_list) < 3:
-                            result_list.append({
-                                "Product Name": product_name,
-                                "Seller": product_seller,
-                                "Price": price,
-                                "Rating":"No rating",
-                                "Reviews":"No Reviews",
-                                "specifications":"No specification",
-                                "Website": href,
-                                "last_updated":current_time
-                            })
-                        if len(result_list) >= 3:
-                            return
-                        
-        else:
-            with lock:
-                # Check if the product is already in the result_list
-                if not any(p['Product Name'] == product_name and p['Seller'] == product_seller for p in result_list):
-                    if len(result_list) < 3:
-                        result_list.append({
-                                "Product Name": product_name,
-                                "Seller": product_seller,
-                                "Price": price,
-                                "Rating":"No rating",
-                                "Reviews":"No Reviews",
-                                "specifications":"No specification",
-                                "Website": href,
-                                "last_updated":current_time
-                        })
-                    if len(result_list) >= 3:
-                        return
+        if not matches_search(seller, model, product["Seller"], product["Product Name"]):
+            continue
+
+        # The collector drops duplicates and anything past its limit
+        collector.add(ProductRecord.from_display(
+            product["Product Name"],
+            product["Seller"],
+            product["Price"],
+            website=product["Website"],
+            source="BuildersMart"
+        ))
+        if collector.full:
+            break
 
 
+    return pager_reach(page)
+
+def pager_reach(page):
     # If there's no 'next' button, stop further processing
-    next_button = soup.find('a', class_='next i-next')
-    if not next_button:
-        return
+    if not page["next_page"]:
+        return 0
+
+    pages = [
+        int(match.group(1))
+        for href in [page["next_page"], *page["page_links"]]
+        for match in [PAGE_PARAM.search(href)]
+        if match
+    ]
+    return max(pages) if pages else MAX_PAGES
 
-def scrape_product_details_builder_mart(item_name, seller=None, model=None):
+def check_status(response, page_number):
+    # A throttled, failing or blocked page must not read as the end of the catalogue
+    if not 200 <= response.status_code < 300:
+        raise RuntimeError(f"page {page_number} request failed with status {response.status_code}")
+
+def scrape_page(page_number, seller, model, base_url, collector, stop_event=None):
+    if stop_event is not None and stop_event.is_set():
+        return 0
+    url = f"{base_url}&p={page_number}"
+    response = get_sync_fetcher().fetch(url, timeout=5, source=SOURCE_NAME)
+    # The quota may have been met while this page was downloading
+    if stop_event is not None and stop_event.is_set():
+        return 0
+    check_status(response, page_number)
+    return parse_page(response.content, seller, model, collector, response_digest(response))
+
+def build_base_url(item_name, seller=None, model=None):
     search_query = item_name.replace(' ', '+')
     if seller:
         search_query += f"+{seller.replace(' ', '+')}"
     if model:
         search_query += f"+{model.replace(' ', '+')}"
 
-    base_url = f"https://www.buildersmart.in/catalogsearch/result/?q={search_query}"
-    result_list = []
-    lock = threading.Lock()
+    return f"{BUILDERSMART_URL}?q={search_query}"
+
+class CrawlRange:
+    """
+    Tracks how far a paginated crawl may go.
+
+    Page 1 is fetched alone; the range then grows to whatever the pager
+    advertises (capped at MAX_PAGES) until a page without a next button
+    pins the last page for good.
+    """
 
-    start_time = time.perf_counter()
+    def __init__(self):
+        self.last_page = 1
+        self.final = False
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = []
-        for page_number in range(1, 21):
-            futures.append(executor.submit(scrape_page, page_number, seller, model, base_url, result_list, lock))
-            
-            with lock:
-                if len(result_list) >= 3:
-                    break
+    def page_finished(self, page_number, reach):
+        if not reach:
+            self.last_page = min(self.last_page, page_number) if self.final else page_number
+            self.final = True
+        elif not self.final:
+            self.last_page = max(self.last_page, min(reach, MAX_PAGES))
 
-        # Wait for all futures to complete or early exit if 10 results found
-        for future in as_completed(futures):
-            with lock:
-                if len(result_list) >= 3:
-                    break  # Exit as soon as 10 results are found
+def crawl_results(collector, failures):
+    """The crawl's products; a crawl that failed pages and found nothing is a source failure"""
+    results = collector.results()
+    if failures and not results:
+        raise failures[0]
+    return ProductBatch(results)
 
-    # end_time = time.perf_counter()
-    # processing_time = end_time - start_time
-    # print(f"Processing Time: {processing_time:.2f} seconds")
+def scrape_product_details_builder_mart(item_name, seller=None, model=None, max_results=DEFAULT_MAX_RESULTS):
+    base_url = build_base_url(item_name, seller, model)
+    collector = ResultCollector(limit=max_results)
+    stop_event = threading.Event()
+
+    crawl = CrawlRange()
+    next_page = 1
+    in_flight = {}
+    failures = []
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    try:
+        while not collector.full:
+            while len(in_flight) < MAX_WORKERS and next_page <= crawl.last_page:
+                future = executor.submit(scrape_page, next_page, seller, model, base_url, collector, stop_event)
+                in_flight[future] = next_page
+                next_page += 1
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_number = in_flight.pop(future)
+                try:
+                    crawl.page_finished(page_number, future.result())
+                except Exception as e:
+                    failures.append(e)
+                    log.warning(f"❌ BuilderMart page {page_number} failed: {e}")
+    finally:
+        # Stop outstanding pages as soon as the quota is met or the crawl ends
+        stop_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return crawl_results(collector, failures)
+
+async def scrape_page_async(page_number, seller, model, base_url, collector):
+    url = f"{base_url}&p={page_number}"
+    response = await get_engine().fetch(url, timeout=5, source=SOURCE_NAME)
+    check_status(response, page_number)
+    products, page = await get_parse_pool().extract("buildersmart", response.content, digest=response_digest(response))
+    return collect_page(products, page, seller, model, collector)
 
-    return json.dumps(result_list, indent=4, ensure_ascii=False)
+async def scrape_product_details_builder_mart_async(item_name, seller=None, model=None, max_results=DEFAULT_MAX_RESULTS):
+    """Async variant of scrape_product_details_builder_mart using the shared engine"""
+    base_url = build_base_url(item_name, seller, model)
+    collector = ResultCollector(limit=max_results)
 
+    crawl = CrawlRange()
+    next_page = 1
+    in_flight = {}
+    failures = []
+    try:
+        while not collector.full:
+            while len(in_flight) < MAX_WORKERS and next_page <= crawl.last_page:
+                task = asyncio.ensure_future(
+                    scrape_page_async(next_page, seller, model, base_url, collector)
+                )
+                in_flight[task] = next_page
+                next_page += 1
+            if not in_flight:
+                break
 
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page_number = in_flight.pop(task)
+                try:
+                    crawl.page_finished(page_number, task.result())
+                except Exception as e:
+                    failures.append(e)
+                    log.warning(f"❌ BuilderMart page {page_number} failed: {e}")
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
 
+    return crawl_results(collector, failures)